@@ -0,0 +1,3 @@
+import logging
+
+logging.disable(logging.WARNING) # keep the tables readable; streamlit warns about bare mode outside `streamlit run`
@@ -0,0 +1,54 @@
+"""Prompt tokens with full flattened keys vs. short ordinal aliases in GeminiTranslator requests.
+
+Lang dicts are shaped like FTB Quests exports (flattened `|` list paths) and converter output
+(`modpack.chapter.quest.field` keys). Keys are echoed back by the model, so the response side
+saves as much as the request side. Tokens use the GPT-4 encoding when it can be loaded and
+GeminiTranslator.SIZE_ESTIMATOR otherwise.
+
+Run from the repository root: python -m benchmarks.bench_alias
+"""
+import json
+import random
+
+from benchmarks.common import sentence
+from benchmarks.bench_batches import make_lang_dict
+from src.translator import GeminiTranslator, TiktokenEstimator, plan_batches
+
+def make_converter_lang_dict(n_strings: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    lang_dict = {}
+    for idx in range(n_strings):
+        chapter, quest = divmod(idx // 3, 40)
+        match idx % 3:
+            case 0:
+                lang_dict[f"atm9.chapter_{chapter}.quests{quest}.title"] = sentence(rng, rng.randint(2, 5))
+            case 1:
+                lang_dict[f"atm9.chapter_{chapter}.quests{quest}.subtitle"] = sentence(rng, rng.randint(4, 10))
+            case _:
+                lang_dict[f"atm9.chapter_{chapter}.quests{quest}.description{rng.randint(0, 9)}"] = sentence(rng, rng.randint(8, 60))
+    return lang_dict
+
+def count_tokens(estimator, text: str) -> int:
+    return estimator.count([""], [text])[0]
+
+def main():
+    try:
+        estimator = TiktokenEstimator()
+        estimator.count(["probe"], ["probe"])
+        name = "tiktoken"
+    except Exception:
+        estimator = GeminiTranslator.SIZE_ESTIMATOR
+        name = "byte estimate"
+    print(f"tokens: {name}")
+    print(f"{'lang dict':>14} {'requests':>9} {'full keys':>10} {'aliased':>9} {'saved':>7}")
+    for label, lang_dict in (("ftbquests", make_lang_dict(10_000)), ("converter", make_converter_lang_dict(10_000))):
+        batches = plan_batches(lang_dict, GeminiTranslator.BATCH_LIMITS, GeminiTranslator.SIZE_ESTIMATOR)
+        full = aliased = 0
+        for batch in batches:
+            masked = {key: GeminiTranslator.protect(value)[0] for key, value in batch.items()}
+            full += 2 * count_tokens(estimator, json.dumps(masked, ensure_ascii=False)) # request and echoed response
+            aliased += 2 * count_tokens(estimator, json.dumps(dict(zip(map(str, range(len(masked))), masked.values())), ensure_ascii=False))
+        print(f"{label:>14} {len(batches):>9} {full:>10} {aliased:>9} {1 - aliased / full:>7.1%}")
+
+if __name__ == "__main__":
+    main()
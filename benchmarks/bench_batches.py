@@ -0,0 +1,71 @@
+"""Requests per 10k strings: greedy in-order batching vs. plan_batches, per backend limits.
+
+Token counts use each backend's offline SIZE_ESTIMATOR. When the GPT-4 BPE file can be loaded,
+the batched, memoized tiktoken path is timed as well. A request is one API call for DeepL and
+Gemini; googletrans sends one HTTP request per string, so Google batches are only the units of
+progress and of the resume journal. Planning 100k strings takes about half a second, short of
+the milliseconds first aimed for: the offline estimate is fast, the pure Python packing is not.
+
+Run from the repository root: python -m benchmarks.bench_batches
+"""
+import random
+
+from benchmarks.common import sentence, timeit
+from src.translator import BatchLimits, ByteEstimator, TiktokenEstimator, plan_batches, GoogleTranslator, DeepLTranslator, GeminiTranslator
+
+def make_lang_dict(n_strings: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    lang_dict = {}
+    for idx in range(n_strings):
+        quest, field = divmod(idx, 4)
+        match field:
+            case 0:
+                lang_dict[f"ftbquests.quest.{quest:016X}.title"] = sentence(rng, rng.randint(2, 5))
+            case 1:
+                lang_dict[f"ftbquests.quest.{quest:016X}.subtitle"] = sentence(rng, rng.randint(4, 10))
+            case _:
+                lang_dict[f"ftbquests.quest.{quest:016X}.description|{field - 2}"] = sentence(rng, rng.randint(8, 120))
+    return lang_dict
+
+def greedy_batches(lang_dict: dict, limits: BatchLimits, estimator: ByteEstimator) -> list[dict]:
+    """The previous make_batches, extended to every limit: fill in dict order, start a new batch on overflow."""
+    caps = tuple(float("inf") if cap is None else cap for cap in limits)
+    tokens = estimator.count(list(lang_dict), list(lang_dict.values()))
+    batches, current, load = [], {}, (0, 0, 0, 0)
+    for (key, value), count in zip(lang_dict.items(), tokens):
+        size = (count, len(value), 1, len(value.encode("utf-8")))
+        if current and any(used + extra > cap for used, extra, cap in zip(load, size, caps)):
+            batches.append(current)
+            current, load = {}, (0, 0, 0, 0)
+        current[key] = value
+        load = tuple(used + extra for used, extra in zip(load, size))
+    if current:
+        batches.append(current)
+    return batches
+
+def main():
+    small, large = make_lang_dict(10_000), make_lang_dict(100_000)
+    print(f"{'backend':>18} {'greedy/10k':>11} {'planned/10k':>12} {'plan 100k (s)':>14}")
+    for translator in (GoogleTranslator, DeepLTranslator, GeminiTranslator):
+        limits, estimator = translator.BATCH_LIMITS, translator.SIZE_ESTIMATOR
+        greedy = len(greedy_batches(small, limits, estimator))
+        planned = len(plan_batches(small, limits, estimator))
+        elapsed = timeit(lambda: plan_batches(large, limits, estimator))
+        print(f"{translator.__name__:>18} {greedy:>11} {planned:>12} {elapsed:>14.3f}")
+    print("GoogleTranslator counts batches; googletrans sends one HTTP request per string")
+    print("planning 100k strings was meant to take milliseconds; best-fit packing in pure Python takes tenths of a second")
+
+    keys, values = list(large), list(large.values())
+    print(f"\n{'estimator':>18} {'count 100k (s)':>15}")
+    print(f"{'bytes':>18} {timeit(lambda: GeminiTranslator.SIZE_ESTIMATOR.count(keys, values)):>15.3f}")
+    try:
+        estimator = TiktokenEstimator()
+        cold = timeit(lambda: (TiktokenEstimator.counts.clear(), estimator.count(keys, values)), repeat=1)
+        warm = timeit(lambda: estimator.count(keys, values))
+        print(f"{'tiktoken (cold)':>18} {cold:>15.3f}")
+        print(f"{'tiktoken (cached)':>18} {warm:>15.3f}")
+    except Exception as e:
+        print(f"{'tiktoken':>18} {'unavailable':>15} ({e.__class__.__name__})")
+
+if __name__ == "__main__":
+    main()
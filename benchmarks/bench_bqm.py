@@ -0,0 +1,69 @@
+"""DefaultQuests.json ingest and conversion in BQMQuestConverter: json and streaming.
+
+Run from the repository root: python -m benchmarks.bench_bqm
+"""
+import json
+import random
+import tracemalloc
+
+from benchmarks.common import make_upload, sentence, timeit
+from src.converter import BQMQuestConverter
+from src.utils import read_file
+
+def make_database(n_quests: int) -> str:
+    """Build a version 3 (BQ 3.x) DefaultQuests.json with `n_quests` quests."""
+    rng = random.Random(0)
+    quest = lambda idx: {
+        "questID": idx,
+        "preRequisites": [rng.randint(0, n_quests) for _ in range(3)],
+        "properties": {"betterquesting": {"name": sentence(rng, 3), "desc": sentence(rng, 30), "icon": {"id": "minecraft:stone", "Count": 1, "Damage": 0}}},
+        "tasks": [{"index": 0, "taskID": "bq_standard:retrieval", "requiredItems": [{"id": "minecraft:iron_ingot", "Count": rng.randint(1, 64)}]}],
+        "rewards": [{"index": 0, "rewardID": "bq_standard:item", "rewards": [{"id": "minecraft:diamond", "Count": 1}]}],
+    }
+    questline = lambda idx: {
+        "lineID": idx,
+        "properties": {"betterquesting": {"name": sentence(rng, 2), "desc": sentence(rng, 10)}},
+        "quests": [{"id": rng.randint(0, n_quests), "x": 0, "y": 0} for _ in range(20)],
+    }
+    return json.dumps({
+        "format": "2.0.0",
+        "questDatabase": [quest(idx) for idx in range(n_quests)],
+        "questLines": [questline(idx) for idx in range(n_quests // 50)],
+    }, indent=4)
+
+def legacy_convert(upload):
+    converter = BQMQuestConverter.__new__(BQMQuestConverter)
+    converter.modpack_name, converter.lang_dict = "bench", {}
+    quest_data = json.loads(read_file(upload))
+    converter._convert(3, quest_data)
+    return json.dumps(quest_data, indent=4, ensure_ascii=False)
+
+def converter_convert(upload):
+    converter = BQMQuestConverter("bench", [upload])
+    quest_arr, _ = converter.convert()
+    return json.dumps(quest_arr[0][1], indent=4, ensure_ascii=False)
+
+def streaming_convert(upload):
+    converter = BQMQuestConverter("bench", [upload], streaming=True)
+    quest_arr, _ = converter.convert()
+    return quest_arr[0][1].getvalue().decode("utf-8")
+
+def peak_mib(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+def main():
+    print(f"{'quests':>7} {'MiB':>5} {'mode':>10} {'time (s)':>9} {'peak (MiB)':>11}")
+    for n_quests in (2_000, 20_000):
+        text = make_database(n_quests)
+        upload = lambda: make_upload(f"DefaultQuests_{n_quests}.json", text)
+        expected = legacy_convert(upload())
+        for mode, func in (("json", legacy_convert), ("converter", converter_convert), ("streaming", streaming_convert)):
+            assert func(upload()) == expected, f"{mode} output differs"
+            print(f"{n_quests:>7} {len(text) / 2 ** 20:>5.1f} {mode:>10} {timeit(lambda: func(upload()), repeat=1):>9.3f} {peak_mib(lambda: func(upload())):>11.1f}")
+
+if __name__ == "__main__":
+    main()
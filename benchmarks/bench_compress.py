@@ -0,0 +1,32 @@
+"""quests.zip size and build time per compression setting in FTBQuestConverter.compress.
+
+Run from the repository root: python -m benchmarks.bench_compress
+"""
+from zipfile import ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2, ZIP_LZMA
+
+from benchmarks.common import make_chapter, timeit
+from src.converter import FTBQuestConverter
+
+def make_converter(n_chapters: int, parallel: bool) -> FTBQuestConverter:
+    converter = FTBQuestConverter("bench", [], parallel=parallel)
+    converter.quest_arr = [(f"chapter_{seed}", make_chapter(200, seed)) for seed in range(n_chapters)]
+    return converter
+
+def main():
+    serial, parallel = make_converter(32, parallel=False), make_converter(32, parallel=True)
+    print(f"{'method':>10} {'level':>6} {'size (KiB)':>11} {'serial (s)':>11} {'parallel (s)':>13}")
+    for name, compression, compresslevel in (
+        ("stored", ZIP_STORED, None),
+        ("deflated", ZIP_DEFLATED, 1),
+        ("deflated", ZIP_DEFLATED, 6),
+        ("deflated", ZIP_DEFLATED, 9),
+        ("bzip2", ZIP_BZIP2, 9),
+        ("lzma", ZIP_LZMA, None),
+    ):
+        size = len(serial.compress(compression, compresslevel).getvalue())
+        serial_time = timeit(lambda: serial.compress(compression, compresslevel), repeat=1)
+        parallel_time = timeit(lambda: parallel.compress(compression, compresslevel), repeat=1)
+        print(f"{name:>10} {compresslevel or '-':>6} {size / 1024:>11.1f} {serial_time:>11.3f} {parallel_time:>13.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Fixed Semaphore(4) + sleep vs. AdaptiveLimiter against a simulated backend that returns 429s.
+
+The backend serves up to CAPACITY concurrent calls and rejects the rest with a 429, like a
+rate-limited translation API. Failed calls are retried after a short backoff. Two checks follow:
+a healthy backend serving batches of mixed sizes at a constant latency must not cut the limit,
+and the 429s of the Google web endpoint must reach the limiter of GoogleTranslator.
+
+Run from the repository root: python -m benchmarks.bench_concurrency
+"""
+import json
+import time
+import random
+import asyncio
+
+import httpx
+from tenacity import wait_fixed
+
+from benchmarks.common import sentence
+from src.jobs import JobStatus
+from src.translator import AdaptiveLimiter, GoogleTranslator
+
+CAPACITY = 10
+GOOGLE_CAPACITY = 4 # below the 8 GETs of GoogleTranslator's initial 4 batches
+LATENCY = 0.02
+SLEEP = 0.05 # stands in for the old 5 s delay, scaled like LATENCY
+BACKOFF = 0.05
+N_BATCHES = 400
+N_STRINGS = 400
+
+class RateLimited(Exception):
+    status_code = 429
+
+class Backend:
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.active = 0
+        self.rejected = 0
+
+    async def call(self):
+        if self.active >= self.capacity:
+            self.rejected += 1
+            raise RateLimited("429 Too Many Requests")
+        self.active += 1
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.active -= 1
+
+async def run_fixed(backend: Backend):
+    semaphore = asyncio.Semaphore(4)
+
+    async def batch():
+        async with semaphore:
+            await asyncio.sleep(SLEEP)
+            while True:
+                try:
+                    return await backend.call()
+                except RateLimited:
+                    await asyncio.sleep(BACKOFF)
+
+    await asyncio.gather(*(batch() for _ in range(N_BATCHES)))
+
+async def run_adaptive(backend: Backend, limiter: AdaptiveLimiter):
+    async def batch():
+        while True:
+            try:
+                async with limiter.slot():
+                    return await backend.call()
+            except RateLimited:
+                await asyncio.sleep(BACKOFF)
+
+    await asyncio.gather(*(batch() for _ in range(N_BATCHES)))
+
+async def run_mixed(limiter: AdaptiveLimiter, seed: int = 0):
+    rng = random.Random(seed)
+    async def batch(size: int):
+        async with limiter.slot(size):
+            await asyncio.sleep(LATENCY) # per request, whatever the batch size
+
+    await asyncio.gather(*(batch(rng.choice((1, 2, 7, 50, 200))) for _ in range(N_BATCHES)))
+
+class GoogleEndpoint(Backend):
+    """The web endpoint behind googletrans: one GET per string, 429 above `capacity` concurrent GETs."""
+    async def get(self, url: str, params: dict | None = None) -> httpx.Response:
+        request = httpx.Request("GET", url)
+        try:
+            await self.call()
+        except RateLimited:
+            return httpx.Response(429, request=request)
+        text = params["q"]
+        return httpx.Response(200, text=json.dumps([[[text.upper(), text, None, None]], None, "en"]), request=request)
+
+async def run_google(endpoint: GoogleEndpoint, translator: GoogleTranslator) -> dict:
+    translator.translator.client.get = endpoint.get
+    target = {}
+    rng = random.Random(0)
+    lang_dict = {f"quest.{idx}": sentence(rng, 6) for idx in range(N_STRINGS)} # no numbers, so nothing is templated
+    await translator.translate(lang_dict, target, "ko_kr", JobStatus(), source_lang="en_us")
+    return target
+
+def main():
+    print(f"{'strategy':>10} {'time (s)':>9} {'batches/s':>10} {'429s':>6} {'final limit':>12}")
+    backend = Backend()
+    start = time.perf_counter()
+    asyncio.run(run_fixed(backend))
+    elapsed = time.perf_counter() - start
+    print(f"{'fixed':>10} {elapsed:>9.2f} {N_BATCHES / elapsed:>10.1f} {backend.rejected:>6} {4:>12}")
+
+    backend, limiter = Backend(), AdaptiveLimiter(initial=4, floor=1, ceiling=32)
+    start = time.perf_counter()
+    asyncio.run(run_adaptive(backend, limiter))
+    elapsed = time.perf_counter() - start
+    print(f"{'adaptive':>10} {elapsed:>9.2f} {N_BATCHES / elapsed:>10.1f} {backend.rejected:>6} {limiter.limit:>12.1f}")
+
+    limiter = AdaptiveLimiter(initial=4, floor=1, ceiling=32)
+    asyncio.run(run_mixed(limiter))
+    print(f"\nhealthy backend, batches of 1-200 strings: final limit {limiter.limit:.1f}")
+    assert limiter.limit > 4, "limit cut without 429s or a slowdown"
+
+    GoogleTranslator._translate.retry.wait = wait_fixed(BACKOFF) # stands in for the exponential backoff
+    endpoint, translator = GoogleEndpoint(GOOGLE_CAPACITY), GoogleTranslator()
+    translator.BATCH_LIMITS = translator.BATCH_LIMITS._replace(items=10) # many small batches in flight
+    target = asyncio.run(run_google(endpoint, translator))
+    print(f"google endpoint: {endpoint.rejected} 429s, final limit {translator.limiter.limit:.1f}, {len(target)}/{N_STRINGS} strings")
+    assert endpoint.rejected and translator.limiter.limit < GoogleTranslator.CONCURRENCY["initial"], "Google 429s did not reach the limiter"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Recursive vs. iterative quest traversal in FTBQuestConverter.
+
+Run from the repository root: python -m benchmarks.bench_convert
+"""
+import copy
+
+import ftb_snbt_lib as slib
+from ftb_snbt_lib import tag
+
+from benchmarks.common import make_chapter, timeit
+from src.converter import FTBQuestConverter
+
+class RecursiveFTBQuestConverter(FTBQuestConverter):
+    """The recursive _convert this benchmark replaced, kept as the baseline."""
+    def _convert(self, quest_data: tag.Compound, lang_key: str, in_place: bool = False):
+        for element in filter(lambda x: quest_data[x], quest_data):
+            if isinstance(quest_data[element], tag.Compound):
+                self._convert(quest_data[element], f"{lang_key}.{element}", in_place)
+            elif isinstance(quest_data[element],tag.List) and issubclass(quest_data[element].subtype, tag.Compound):
+                for idx in range(len(quest_data[element])):
+                    self._convert(quest_data[element][idx], f"{lang_key}.{element}{idx}", in_place)
+            
+            if element in ("title", "subtitle", "description"):
+                if isinstance(quest_data[element], tag.String) and self._filter(quest_data[element]):
+                    self.lang_dict[f"{lang_key}.{element}"] = self._escape(quest_data[element])
+                    if not in_place:
+                        quest_data[element] = tag.String(f"{{{lang_key}.{element}}}")
+                elif isinstance(quest_data[element], tag.List) and issubclass(quest_data[element].subtype, tag.String):
+                    for lang_idx, data_idx in enumerate(filter(lambda x: self._filter(quest_data[element][x]), range(len(quest_data[element])))):
+                        self.lang_dict[f"{lang_key}.{element}{lang_idx}"] = self._escape(quest_data[element][data_idx])
+                        if not in_place:
+                            quest_data[element][data_idx] = tag.String(f"{{{lang_key}.{element}{lang_idx}}}")
+
+def make_converter(cls, quest_arr: list) -> FTBQuestConverter:
+    converter = cls.__new__(cls) # skip parsing, the trees are built in memory
+    FTBQuestConverter.__init__(converter, "bench", [])
+    converter.quest_arr = copy.deepcopy(quest_arr)
+    return converter
+
+def main():
+    print(f"{'quests':>8} {'recursive (s)':>14} {'iterative (s)':>14} {'speedup':>8}")
+    for n_quests in (100, 1000, 5000, 20000):
+        quest_arr = [(f"chapter_{seed}", make_chapter(n_quests // 4, seed)) for seed in range(4)]
+
+        recursive, iterative = make_converter(RecursiveFTBQuestConverter, quest_arr), make_converter(FTBQuestConverter, quest_arr)
+        recursive_arr, recursive_lang = recursive.convert()
+        iterative_arr, iterative_lang = iterative.convert()
+        assert list(recursive_lang.items()) == list(iterative_lang.items()), "lang output differs"
+        assert [slib.dumps(data) for _, data in recursive_arr] == [slib.dumps(data) for _, data in iterative_arr], "quest output differs"
+
+        recursive_runs = [make_converter(RecursiveFTBQuestConverter, quest_arr) for _ in range(3)]
+        iterative_runs = [make_converter(FTBQuestConverter, quest_arr) for _ in range(3)]
+        recursive_time = timeit(lambda: recursive_runs.pop().convert()) # each run converts a fresh copy
+        iterative_time = timeit(lambda: iterative_runs.pop().convert())
+        print(f"{n_quests:>8} {recursive_time:>14.3f} {iterative_time:>14.3f} {recursive_time / iterative_time:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
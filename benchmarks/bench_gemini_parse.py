@@ -0,0 +1,74 @@
+"""Gemini response parsing: strict json vs. the repair path, with regression checks.
+
+Complete responses wrapped in a code fence, prose or a trailing note, or holding a trailing comma,
+must keep every key. Truncated responses drop their last key, which may be cut short. A stubbed
+chain then checks that a prose-wrapped answer costs no follow-up request.
+
+Run from the repository root: python -m benchmarks.bench_gemini_parse
+"""
+import json
+import random
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.common import sentence, timeit
+from src.translator import GeminiTranslator
+
+ANSWER = {"0": "다이아몬드 <0>곡괭이<1>", "1": "He said \"hi\" {x}", "2": "끝"}
+BODY = json.dumps(ANSWER, ensure_ascii=False)
+COMPLETE = {
+    "plain": BODY,
+    "fenced": f"```json\n{BODY}\n```",
+    "prose": f"Sure! Here is the translation:\n```json\n{BODY}\n```",
+    "trailing note": f"```json\n{BODY}\n```\nNote: proper nouns were translated phonetically.",
+    "trailing comma": BODY[:-1] + ",}",
+}
+TRUNCATED = {
+    "cut in a value": BODY[:BODY.index("끝") + 1],
+    "cut after a value": BODY[:-1],
+    "fenced, cut": f"```json\n{BODY[:BODY.index('끝')]}",
+}
+N_KEYS = 200
+
+class StubChain:
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def ainvoke(self, inputs: dict, config: dict | None = None) -> dict:
+        self.calls += 1
+        query = json.loads(inputs["query"])
+        body = json.dumps({alias: value.upper() for alias, value in query.items()})
+        return GeminiTranslator.parse_message(SimpleNamespace(content=self.text.format(body=body), response_metadata={"finish_reason": "STOP"}))
+
+class StubGeminiTranslator(GeminiTranslator):
+    def __init__(self, text: str):
+        super().__init__("stub")
+        self.chain = StubChain(text)
+
+    @property
+    def translator(self) -> StubChain:
+        return self.chain
+
+def check():
+    for name, text in COMPLETE.items():
+        assert GeminiTranslator.parse_json(text) == ANSWER, f"{name}: {GeminiTranslator.parse_json(text)}"
+    expected = dict(list(ANSWER.items())[:-1])
+    for name, text in TRUNCATED.items():
+        assert GeminiTranslator.parse_json(text) == expected, f"{name}: {GeminiTranslator.parse_json(text)}"
+    assert GeminiTranslator.parse_json(BODY, truncated=True) == expected, "finish reason ignored"
+
+    translator = StubGeminiTranslator("Sure! Here is the translation:\n```json\n{body}\n```")
+    out = asyncio.run(translator._translate({"a.title": "Hello", "a.desc": "World"}, "ko_kr"))
+    assert out == {"a.title": "HELLO", "a.desc": "WORLD"} and translator.chain.calls == 1, f"{out} in {translator.chain.calls} requests"
+
+def main():
+    check()
+    rng = random.Random(0)
+    body = json.dumps({str(idx): sentence(rng) for idx in range(N_KEYS)})
+    print(f"{'response':>14} {'parse (ms)':>11}")
+    for name, text in (("plain", body), ("prose", f"Sure!\n```json\n{body}\n```\nDone."), ("truncated", body[:-10])):
+        print(f"{name:>14} {timeit(lambda: GeminiTranslator.parse_json(text), repeat=20) * 1000:>11.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Cold start import time of app.py and the pages, profiled with `python -X importtime`.
+
+Each run imports the modules that app.py and pages/*.py import in a fresh interpreter, so
+nothing is cached in-process. The report lists the slowest modules by cumulative time. The
+run fails when the median total exceeds BUDGET_SECONDS, or when a backend SDK is loaded
+before a backend is selected.
+
+Run from the repository root: python -m benchmarks.bench_import [--budget SECONDS]
+"""
+import os
+import re
+import ast
+import sys
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = ["app.py", *sorted(os.path.join("pages", name) for name in os.listdir("pages") if name.endswith(".py"))]
+LAZY_MODULES = ["googletrans", "deepl", "tiktoken", "langchain_core", "langchain_google_genai"] # loaded when a backend is selected
+BUDGET_SECONDS = 1.25
+N_RUNS = 5
+N_TOP = 15
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def entry_imports(paths: list[str]) -> list[str]:
+    """Top-level modules imported by the entry point scripts, in first-seen order."""
+    modules = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                modules.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def profile(modules: list[str]) -> tuple[dict[str, int], int, set[str]]:
+    """Import `modules` in a fresh interpreter.
+
+    Returns cumulative microseconds per module, the total of the outermost imports, and the loaded modules.
+    """
+    code = f"import sys; import {', '.join(modules)}; print(','.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    cumulative = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+            if len(match.group(3)) == 1: # not nested in another import
+                total += int(match.group(2))
+    return cumulative, total, set(proc.stdout.strip().split(","))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="maximum median import time in seconds")
+    args = parser.parse_args()
+
+    modules = entry_imports(ENTRY_POINTS)
+    runs = [profile(modules) for _ in range(N_RUNS)]
+    total = statistics.median(total for _, total, _ in runs) / 1e6
+    cumulative, _, loaded = runs[-1]
+
+    print(f"{'module':<56} {'cumulative (ms)':>16}")
+    for module, us in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:N_TOP]:
+        print(f"{module:<56} {us / 1000:>16.1f}")
+    print(f"\nmedian of {N_RUNS} cold starts: {total:.3f} s (budget {args.budget:.3f} s)")
+
+    failures = []
+    if total > args.budget:
+        failures.append(f"import time {total:.3f} s exceeds the budget of {args.budget:.3f} s")
+    eager = [module for module in LAZY_MODULES if module in loaded]
+    if eager:
+        failures.append(f"backend SDKs imported at startup: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
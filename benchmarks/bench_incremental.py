@@ -0,0 +1,46 @@
+"""Full vs. incremental FTBQuestConverter runs when a few chapters changed since the last run.
+
+The incremental run reads a manifest written by a previous run over the same modpack. The
+run fails if its lang_dict or quests.zip contents differ from those of a full run.
+
+Run from the repository root: python -m benchmarks.bench_incremental
+"""
+import tempfile
+from zipfile import ZipFile
+
+import ftb_snbt_lib as slib
+
+from benchmarks.common import make_chapter, make_upload, timeit
+from src.converter import FTBQuestConverter, QuestManifest
+
+N_CHAPTERS = 64
+
+def convert(texts: list[str], manifest_path: str | None = None) -> FTBQuestConverter:
+    converter = FTBQuestConverter("bench", [make_upload(f"chapter_{idx}.snbt", text) for idx, text in enumerate(texts)], manifest_path=manifest_path)
+    converter.convert()
+    return converter
+
+def zip_contents(converter: FTBQuestConverter) -> dict:
+    with ZipFile(converter.compress()) as zip_file:
+        return {name: zip_file.read(name) for name in zip_file.namelist()}
+
+def main():
+    texts = [slib.dumps(make_chapter(50, seed)) for seed in range(N_CHAPTERS)]
+    with tempfile.TemporaryDirectory() as directory:
+        manifest_path = QuestManifest.path_for("bench", directory)
+        print(f"{'changed':>8} {'full (s)':>9} {'incremental (s)':>16} {'speedup':>8}")
+        for n_changed in (0, 1, 4, 16, N_CHAPTERS):
+            convert(texts, manifest_path) # manifest of the previous pack version
+            updated = [slib.dumps(make_chapter(50, N_CHAPTERS + seed)) for seed in range(n_changed)] + texts[n_changed:]
+
+            full, incremental = convert(updated), convert(updated, manifest_path)
+            assert incremental.lang_dict == full.lang_dict, "lang_dict differs from a full run"
+            assert zip_contents(incremental) == zip_contents(full), "quests.zip differs from a full run"
+
+            full_time = timeit(lambda: convert(updated).compress(), repeat=1)
+            convert(texts, manifest_path) # back to the previous version
+            incremental_time = timeit(lambda: convert(updated, manifest_path).compress(), repeat=1)
+            print(f"{n_changed:>8} {full_time:>9.3f} {incremental_time:>16.3f} {full_time / incremental_time:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
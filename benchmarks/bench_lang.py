@@ -0,0 +1,47 @@
+"""LANGConverter throughput against the regex/concatenation implementation it replaced.
+
+Run from the repository root: python -m benchmarks.bench_lang
+"""
+import io
+import re
+import random
+
+from benchmarks.common import sentence, timeit
+from src.converter import LANGConverter
+
+def legacy_lang_to_json(data: str) -> dict:
+    output = {}
+    for line in data.splitlines():
+        if line.startswith("#") or not line:
+            continue
+        key, value = re.compile('(.*)=(.*)').match(line).groups()
+        output[key] = value.replace("%n", r"\n")
+    return output
+
+def legacy_json_to_lang(data: dict) -> str:
+    output = ""
+    for key, value in data.items():
+        value = value.replace(r"\n", "%n")
+        output += f"{key}={value}\n"
+    return output
+
+def main():
+    converter = LANGConverter()
+    rng = random.Random(0)
+    print(f"{'lines':>8} {'MiB':>6} {'parse legacy':>13} {'parse new':>10} {'write legacy':>13} {'write new':>10} {'write stream':>13}")
+    for n_lines in (10_000, 100_000, 300_000):
+        data = {f"modpack.quests{idx}.desc": sentence(rng, 12) for idx in range(n_lines)}
+        lang = converter.convert_json_to_lang(data)
+        assert converter.convert_lang_to_json(lang) == legacy_lang_to_json(lang) == data
+        assert lang == legacy_json_to_lang(data)
+
+        parse_legacy = timeit(lambda: legacy_lang_to_json(lang))
+        parse_new = timeit(lambda: dict(converter.parse_lang(io.StringIO(lang))))
+        write_legacy = timeit(lambda: legacy_json_to_lang(data))
+        write_new = timeit(lambda: converter.convert_json_to_lang(data))
+        write_stream = timeit(lambda: converter.write_lang(data, io.StringIO()))
+        rate = lambda seconds: f"{len(lang) / seconds / 2 ** 20:.0f} MiB/s"
+        print(f"{n_lines:>8} {len(lang) / 2 ** 20:>6.1f} {rate(parse_legacy):>13} {rate(parse_new):>10} {rate(write_legacy):>13} {rate(write_new):>10} {rate(write_stream):>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""src.utils.dump_json against json.dumps(indent=4, ensure_ascii=False) on lang dicts.
+
+Run from the repository root: python -m benchmarks.bench_output
+"""
+import json
+import random
+
+from benchmarks.common import sentence, timeit
+from src.utils import dump_json
+
+def main():
+    rng = random.Random(0)
+    print(f"{'entries':>8} {'MiB':>6} {'json (s)':>9} {'dump_json (s)':>14} {'speedup':>8}")
+    for n_entries in (10_000, 100_000, 300_000):
+        data = {f"atm9.chapter_{idx % 100}.quests{idx}.description0": sentence(rng, 12) + " 한국어 ü" for idx in range(n_entries)}
+        expected = json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+        assert dump_json(data) == expected
+
+        json_time = timeit(lambda: json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8"))
+        orjson_time = timeit(lambda: dump_json(data))
+        print(f"{n_entries:>8} {len(expected) / 2 ** 20:>6.1f} {json_time:>9.3f} {orjson_time:>14.3f} {json_time / orjson_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Serial vs. process-pool SNBT parsing in FTBQuestConverter.
+
+Run from the repository root: python -m benchmarks.bench_parse
+"""
+import os
+
+import ftb_snbt_lib as slib
+
+import src.converter
+from benchmarks.common import make_chapter, make_upload, timeit
+from src.converter import FTBQuestConverter
+
+src.converter.PARALLEL_MIN_QUESTS = 0 # measure small inputs too, to find where the cutoff belongs
+
+def main():
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'chapters':>8} {'serial (s)':>11} {'parallel (s)':>13} {'speedup':>8}")
+    for n_chapters in (1, 2, 4, 8, 16, 32, 64):
+        texts = [slib.dumps(make_chapter(50, seed)) for seed in range(n_chapters)]
+        uploads = lambda: [make_upload(f"chapter_{idx}.snbt", text) for idx, text in enumerate(texts)]
+
+        serial = timeit(lambda: FTBQuestConverter("bench", uploads()), repeat=1)
+        parallel = timeit(lambda: FTBQuestConverter("bench", uploads(), parallel=True), repeat=1)
+        print(f"{n_chapters:>8} {serial:>11.3f} {parallel:>13.3f} {serial / parallel:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
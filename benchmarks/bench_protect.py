@@ -0,0 +1,62 @@
+"""Placeholder protection round trip over a large lang corpus: the old regex passes vs. protect/restore.
+
+The old _escape/_unescape only covered newlines and color codes; protect also masks {...}, [...]
+and printf-style formats, so the sentinel counts show what no longer reaches the backend.
+
+Run from the repository root: python -m benchmarks.bench_protect
+"""
+import re
+import random
+
+from benchmarks.common import sentence, timeit
+from src.translator import Translator
+
+N_STRINGS = 100_000
+EXTRAS = ["{@pagebreak}", "[Shift]", "%s", "{image:ftbquests:textures/item.png width:64}", "%d%%", ""]
+REGRESSIONS = { # text: spans protect must mask
+    "Gives 10% speed": [],
+    "50% done": [],
+    "a % chance": [],
+    "5%damage": [],
+    "%s's %1$s, %.2f and %d%%": ["%s", "%1$s", "%.2f", "%d%%"],
+    "&aGreen&r\\n%s": ["&a", "&r\\n%s"],
+}
+
+def legacy_escape(text: str) -> str:
+    text = re.sub(r"(\\n)", r"<br>", text) # escape newline
+    return re.sub(r"(&[0-9a-z])", lambda x: f"<{x.group(0)[1:]}>", text) # escape color code
+
+def legacy_unescape(text: str) -> str:
+    text = re.sub(r"(<[0-9a-zA-Z]>)", lambda x: f"&{x.group(0)[1:-1].lower()}", text) # restore color code
+    text = re.sub(r"&(?=[^0-9a-z]|$)", r"\&", text) # escape single &
+    text = re.sub(r"(<br>|<BR>)", r"\\n", text) # restore newline
+    return text
+
+def make_corpus(n_strings: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{sentence(rng, rng.randint(3, 40))} {rng.choice(EXTRAS)}" for _ in range(n_strings)]
+
+def legacy_round_trip(corpus: list[str]):
+    for text in corpus:
+        legacy_unescape(legacy_escape(text))
+
+def round_trip(corpus: list[str]):
+    for text in corpus:
+        Translator.restore(*Translator.protect(text))
+
+def main():
+    for text, expected in REGRESSIONS.items():
+        masked, spans = Translator.protect(text)
+        assert spans == expected and Translator.restore(masked, spans) == text, f"{text!r} masked as {masked!r}"
+
+    corpus = make_corpus(N_STRINGS)
+    masked = [Translator.protect(text) for text in corpus]
+    assert all(Translator.restore(text, spans) == Translator.restore(*Translator.protect(original)) for (text, spans), original in zip(masked, corpus))
+    legacy_chars = sum(map(len, map(legacy_escape, corpus)))
+    chars = sum(len(text) for text, _ in masked)
+    print(f"{'engine':>8} {'round trip (s)':>15} {'chars sent':>11} {'sentinels':>10}")
+    print(f"{'legacy':>8} {timeit(lambda: legacy_round_trip(corpus)):>15.3f} {legacy_chars:>11} {'-':>10}")
+    print(f"{'protect':>8} {timeit(lambda: round_trip(corpus)):>15.3f} {chars:>11} {sum(len(spans) for _, spans in masked):>10}")
+
+if __name__ == "__main__":
+    main()
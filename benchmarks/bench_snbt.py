@@ -0,0 +1,61 @@
+"""SNBTConverter against the JSON round trip it replaced, on a 50k-entry FTB 1.21 lang file.
+
+Run from the repository root: python -m benchmarks.bench_snbt
+"""
+import json
+import random
+import tracemalloc
+
+import ftb_snbt_lib as slib
+
+from benchmarks.common import sentence, timeit
+from src.converter import SNBTConverter
+
+def legacy_snbt_to_json(tag: slib.Compound) -> dict:
+    return json.loads(json.dumps(tag, ensure_ascii=False))
+
+def legacy_json_to_snbt(data: dict) -> slib.Compound:
+    output = slib.Compound()
+    for key, value in data.items():
+        if isinstance(value, str):
+            output[key] = slib.String(value.replace("\n", "\\n"))
+        elif isinstance(value, list):
+            output[key]  = slib.List([slib.String('')] * len(value))
+            for idx, val in enumerate(value):
+                if isinstance(val, str):
+                    output[key][idx] = slib.String(val.replace("\n", "\\n"))
+    return output
+
+def peak_mib(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+def make_lang(n_entries: int) -> slib.Compound:
+    rng = random.Random(0)
+    lang = slib.Compound()
+    for idx in range(n_entries):
+        if idx % 5:
+            lang[f"quest.{idx:016X}.title"] = slib.String(sentence(rng, 4))
+        else:
+            lang[f"quest.{idx:016X}.quest_desc"] = slib.List([slib.String(sentence(rng, 10)) for _ in range(4)])
+    return lang
+
+def main():
+    converter = SNBTConverter()
+    lang = make_lang(50_000)
+    data = converter.convert_snbt_to_json(lang)
+    assert data == legacy_snbt_to_json(lang)
+    assert slib.dumps(converter.convert_json_to_snbt(data)) == slib.dumps(legacy_json_to_snbt(data))
+
+    print(f"{'direction':>13} {'legacy (s)':>11} {'new (s)':>8} {'legacy peak (MiB)':>18} {'new peak (MiB)':>15}")
+    for direction, legacy, new, arg in (
+        ("snbt -> json", legacy_snbt_to_json, converter.convert_snbt_to_json, lang),
+        ("json -> snbt", legacy_json_to_snbt, converter.convert_json_to_snbt, data),
+    ):
+        print(f"{direction:>13} {timeit(lambda: legacy(arg)):>11.3f} {timeit(lambda: new(arg)):>8.3f} {peak_mib(lambda: legacy(arg)):>18.1f} {peak_mib(lambda: new(arg)):>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Strings and characters sent to the Google backend with and without number templating.
+
+The backend is stubbed to upper-case its input, so every string that reaches it comes back
+changed: the check at the start fails if a templated string, such as one that starts and ends
+with a number, is returned untranslated.
+
+Run from the repository root: python -m benchmarks.bench_templates
+"""
+import random
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.common import sentence, timeit
+from src.jobs import JobStatus
+from src.translator import Translator, GoogleTranslator
+
+N_STRINGS = 20_000
+PAIRS = {
+    "a": "1 Diamond for 5", "b": "2 Diamond for 9", # template {0} Diamond for {1}
+    "c": "Craft 64 Iron", "d": "Craft 32 Iron",
+    "e": "Tier 2", "f": "Tier 3",
+    "g": "Unique text",
+}
+
+class StubClient:
+    def __init__(self):
+        self.strings = 0
+        self.chars = 0
+
+    async def translate(self, texts: list[str], dest: str) -> list:
+        self.strings += len(texts)
+        self.chars += sum(map(len, texts))
+        return [SimpleNamespace(text=text.upper()) for text in texts]
+
+class StubGoogleTranslator(GoogleTranslator):
+    def __init__(self, templating: bool = True):
+        super().__init__()
+        self.client = StubClient()
+        if not templating:
+            self.templatize = lambda lang_dict: (dict(lang_dict), {})
+
+    @property
+    def translator(self) -> StubClient:
+        return self.client
+
+def translate(lang_dict: dict, templating: bool = True) -> tuple[dict, StubClient]:
+    translator = StubGoogleTranslator(templating)
+    target = {}
+    asyncio.run(translator.translate(lang_dict, target, "ko_kr", JobStatus(), source_lang="en_us"))
+    return target, translator.client
+
+def expected(value: str) -> str:
+    """What the stubbed backend returns for `value`: the text upper-cased, formatting kept."""
+    masked, spans = Translator.protect(value)
+    return Translator.restore(masked.upper(), spans)
+
+def make_corpus(n_strings: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {f"quest.{idx}": f"{rng.randint(1, 64)} {sentence(rng, rng.randint(2, 6))} {rng.randint(1, 9)}" for idx in range(n_strings)}
+
+def main():
+    target, _ = translate(PAIRS)
+    assert target == {key: expected(value) for key, value in PAIRS.items()}, f"untranslated strings: {target}"
+
+    corpus = make_corpus(N_STRINGS)
+    print(f"{'templating':>10} {'strings sent':>13} {'chars sent':>11} {'time (s)':>9}")
+    for templating in (False, True):
+        target, client = translate(corpus, templating)
+        assert all(target[key] == expected(value) for key, value in corpus.items()), "output differs"
+        elapsed = timeit(lambda: translate(corpus, templating), repeat=1)
+        print(f"{str(templating):>10} {client.strings:>13} {client.chars:>11} {elapsed:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import time
+import random
+import ftb_snbt_lib as slib
+from streamlit.proto.Common_pb2 import FileURLs
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+WORDS = ["Diamond", "Pickaxe", "&aAllthemodium&r", "Ingot", "Craft", "the", "a", "Machine", "Tier", "Upgrade", "Template", "\\n", "Mekanism", "&6Reactor&r", "Cable"]
+
+def sentence(rng: random.Random, length: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+def make_chapter(n_quests: int, seed: int = 0) -> slib.Compound:
+    """Build a synthetic FTB Quests chapter shaped like the ones in large modpacks."""
+    rng = random.Random(seed)
+    quests = []
+    for idx in range(n_quests):
+        quests.append(slib.Compound({
+            "id": slib.String(f"{idx:016X}"),
+            "title": slib.String(sentence(rng, 3)),
+            "subtitle": slib.String(sentence(rng, 5)),
+            "description": slib.List([slib.String(sentence(rng)), slib.String(""), slib.String("{@pagebreak}"), slib.String(sentence(rng, 12))]),
+            "x": slib.Double(rng.random() * 10),
+            "y": slib.Double(rng.random() * 10),
+            "tasks": slib.List([slib.Compound({
+                "id": slib.String(f"{idx:08X}{task:08X}"),
+                "type": slib.String("item"),
+                "title": slib.String(sentence(rng, 4)),
+                "count": slib.Long(rng.randint(1, 64)),
+            }) for task in range(3)]),
+            "rewards": slib.List([slib.Compound({
+                "id": slib.String(f"{idx:08X}FFFF{reward:04X}"),
+                "type": slib.String("xp"),
+                "xp": slib.Integer(rng.randint(10, 100)),
+            }) for reward in range(2)]),
+        }))
+    return slib.Compound({
+        "id": slib.String(f"{seed:016X}"),
+        "filename": slib.String(f"chapter_{seed}"),
+        "title": slib.String(sentence(rng, 3)),
+        "quests": slib.List(quests),
+    })
+
+def make_upload(name: str, text: str) -> UploadedFile:
+    """Wrap `text` the way st.file_uploader hands it to the pages."""
+    return UploadedFile(UploadedFileRec(file_id=name, name=name, type="text/plain", data=text.encode("utf-8")), FileURLs())
+
+def timeit(func, repeat: int = 3) -> float:
+    """Return the best wall time of `repeat` runs in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
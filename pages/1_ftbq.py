@@ -1,14 +1,15 @@
 import copy
 import time
 import json
-from tempfile import TemporaryDirectory
+import asyncio
 
 import streamlit as st
 
 from src.constants import MINECRAFT_LANGUAGES, MINECRAFT_TO_GOOGLE, MINECRAFT_TO_DEEPL
-from src.converter import FTBQuestConverter
-from src.translator import GoogleTranslator, DeepLTranslator, GeminiTranslator
-from src.utils import Message, read_file, check_deepl_key, check_gemini_key, generate_task_key, schedule_task, process_tasks
+from src.converter import FTBQuestConverter, QuestManifest
+from src.translator import get_translator
+from src.jobs import Job
+from src.utils import Message, read_file, check_deepl_key, check_gemini_key, dump_json, cache_output, get_translation_memory, submit_job, get_job, show_job
 
 Message("ftbq_title").title()
 st.page_link(
@@ -21,6 +22,51 @@ st.divider()
 
 Message("ftbq_readme").info()
 
+job = get_job("ftbq_job")
+if job is not None and show_job(job):
+    result = job.result()
+    with st.container(border=True):
+        Message("downloads_header").subheader()
+        
+        if result["do_convert"]:
+            zip_filename = "quests.zip"
+            quest_zip_download = st.download_button(
+                label = zip_filename,
+                data = cache_output(job.id, zip_filename, lambda: result["converter"].compress().getvalue()),
+                file_name = zip_filename,
+                on_click = "ignore",
+                mime = "application/zip"
+            )
+        
+        if result["do_convert"] and not result["in_place"]:
+            source_lang_filename = f"{result['source_lang']}.json"
+            source_lang_download = st.download_button(
+                label = source_lang_filename,
+                data = cache_output(job.id, source_lang_filename, lambda: dump_json(result["converter"].lang_dict)),
+                file_name = source_lang_filename,
+                on_click = "ignore",
+                mime = "application/json"
+            )
+        
+        if result["do_translate"] and not result["in_place"]:
+            target_lang_filename = f"{result['target_lang']}.json"
+            target_lang_download = st.download_button(
+                label = target_lang_filename,
+                data = cache_output(job.id, target_lang_filename, lambda: dump_json(result["target_lang_dict"])),
+                file_name = target_lang_filename,
+                on_click = "ignore",
+                mime = "application/json"
+            )
+
+    with st.container(border=True):
+        Message("user_guide_header").subheader()
+
+        Message("user_guide_ftbq_1").send()
+        if result["do_translate"] and not result["in_place"]:
+            Message("user_guide_ftbq_2", source_lang=result["source_lang"], target_lang=result["target_lang"]).send()
+        elif not result["do_translate"]:
+            Message("user_guide_ftbq_3", source_lang=result["source_lang"]).send()
+
 with st.form("task_form"):
     Message("modpack_name_header").subheader()
     modpack_name = st.text_input(
@@ -32,11 +78,12 @@ with st.form("task_form"):
     Message("select_task_header").subheader()
     task = st.radio(
         label = Message("select_task_label").text,
-        options = [0, 1, 2],
+        options = [0, 1, 2, 3],
         format_func = lambda x: {
             0: Message("select_task_convert_translate").text,
             1: Message("select_task_convert_no_translate").text,
             2: Message("select_task_translate_only").text,
+            3: Message("select_task_translate_in_place").text,
         }[x],
         key = "task"
     )
@@ -69,12 +116,19 @@ match task:
     case 0:
         st.session_state.do_convert = True
         st.session_state.do_translate = True
+        st.session_state.in_place = False
     case 1:
         st.session_state.do_convert = True
         st.session_state.do_translate = False
+        st.session_state.in_place = False
     case 2:
         st.session_state.do_convert = False
         st.session_state.do_translate = True
+        st.session_state.in_place = False
+    case 3:
+        st.session_state.do_convert = True
+        st.session_state.do_translate = True
+        st.session_state.in_place = True
 
 with st.container(border=True):    
     if st.session_state.do_convert:
@@ -113,7 +167,7 @@ with st.container(border=True):
         match translator_service:
             case "Google":
                 lang_list = list(MINECRAFT_TO_GOOGLE)
-                translator = GoogleTranslator()
+                translator = get_translator("Google", memory=get_translation_memory())
             case "DeepL":
                 deepl_key = st.session_state.deepl_key
                 if not deepl_key:
@@ -121,14 +175,14 @@ with st.container(border=True):
                 if not check_deepl_key(deepl_key):
                     Message("api_key_invalid", stop=True).error()
                 lang_list = list(MINECRAFT_TO_DEEPL)
-                translator = DeepLTranslator(auth_key=deepl_key)
+                translator = get_translator("DeepL", deepl_key, memory=get_translation_memory())
             case "Gemini":
                 gemini_key = st.session_state.gemini_key
                 if not gemini_key:
                     Message("api_key_empty", stop=True).info()
                 if not check_gemini_key(gemini_key):
                     Message("api_key_invalid", stop=True).error()
-                translator = GeminiTranslator(auth_key=gemini_key)
+                translator = get_translator("Gemini", gemini_key, memory=get_translation_memory())
 
     source_lang = st.selectbox(
         label = Message("select_source_lang_label").text,
@@ -153,92 +207,53 @@ button = st.button(
     type = "primary",
     use_container_width = True,
     key = "running",
-    disabled = st.session_state.get("running", False)
+    disabled = st.session_state.get("running", False) or (job is not None and not job.done())
 )
 
 if button:
     with st.spinner("Loading...", show_time=True):
         time.sleep(3)
     
-    status = st.status(
-        label = Message("status_in_progress").text,
-        expanded = True
-    )
-
+    do_convert = st.session_state.do_convert
+    do_translate = st.session_state.do_translate
+    in_place = st.session_state.in_place
+    target_lang = target_lang if do_translate else None
+    step_1 = Message("status_step_1").text
+    step_2 = Message("status_step_2").text
     source_lang_dict = json.loads(read_file(lang_file)) if st.session_state.lang_exists else {}
-    target_lang_dict = copy.deepcopy(source_lang_dict)
-    
-    try:
-        if st.session_state.do_convert:
-            Message("status_step_1", st_container=status).send()
-            converter = FTBQuestConverter(modpack_name, quest_files)
-            converter.lang_dict.update(source_lang_dict)
-            converted_quest_arr, source_lang_dict = converter.convert()
-            
-        if st.session_state.do_translate:
-            Message("status_step_2", st_container=status).send()
-            if source_lang_dict:
-                task_key = f"task-{generate_task_key(time.time())}"
-                schedule_task(
-                    task_key,
-                    translator.translate(source_lang_dict, target_lang_dict, target_lang, status)
-                )
-                process_tasks()
-    except Exception as e:
-        status.update(
-            label = Message("status_error").text,
-            state = "error"
-        )
-        status.error(f"An error occurred while localizing: {e}")
-        st.stop()
-    finally:
-        del st.session_state.tasks[task_key]
-    
-    status.update(
-        label = Message("status_done").text,
-        state = "complete"
-    )
     
-    with st.container(border=True):
-        Message("downloads_header").subheader()
+    async def localize(job: Job) -> dict:
+        lang_dict = source_lang_dict
+        target_lang_dict = await asyncio.to_thread(copy.deepcopy, source_lang_dict) # off the shared job loop
+        converter = None
+        if do_convert:
+            job.status.write(step_1)
+            converter = await asyncio.to_thread( # parses every chapter changed since the last conversion of the modpack
+                FTBQuestConverter, modpack_name, quest_files, parallel=True,
+                manifest_path=None if in_place else QuestManifest.path_for(modpack_name) # in-place runs need every tree
+            )
+            converter.lang_dict.update(lang_dict)
+            _, lang_dict = await asyncio.to_thread(converter.convert, in_place=in_place)
         
-        if st.session_state.do_convert:
-            with TemporaryDirectory() as temp_dir:
-                zip_filename = "quests.zip"
-                zip_dir = converter.compress(temp_dir, zip_filename)
-                
-                quest_zip_download = st.download_button(
-                    label = zip_filename,
-                    data = open(zip_dir, "rb"),
-                    file_name = zip_filename,
-                    on_click = "ignore",
-                    mime = "application/zip"
+        if do_translate:
+            job.status.write(step_2)
+            if lang_dict:
+                await translator.translate(
+                    lang_dict, target_lang_dict, target_lang, job.status, source_lang=source_lang,
+                    on_partial=None if in_place else job.snapshot(f"{target_lang}.json", "application/json", lambda: dump_json(target_lang_dict))
                 )
-            
-            source_lang_filename = f"{source_lang}.json"
-            source_lang_download = st.download_button(
-                label = source_lang_filename,
-                data = json.dumps(converter.lang_dict, indent=4, ensure_ascii=False),
-                file_name = source_lang_filename,
-                on_click = "ignore",
-                mime = "application/json"
-            )
         
-        if st.session_state.do_translate:
-            target_lang_filename = f"{target_lang}.json"
-            target_lang_download = st.download_button(
-                label = target_lang_filename,
-                data = json.dumps(target_lang_dict, indent=4, ensure_ascii=False),
-                file_name = target_lang_filename,
-                on_click = "ignore",
-                mime = "application/json"
-            )
-
-    with st.container(border=True):
-        Message("user_guide_header").subheader()
-
-        Message("user_guide_ftbq_1").send()
-        if st.session_state.do_translate:
-            Message("user_guide_ftbq_2", source_lang=source_lang, target_lang=target_lang).send()
-        else:
-            Message("user_guide_ftbq_3", source_lang=source_lang).send()
\ No newline at end of file
+        if in_place:
+            await asyncio.to_thread(converter.apply, target_lang_dict)
+        return {
+            "do_convert": do_convert,
+            "do_translate": do_translate,
+            "in_place": in_place,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "converter": converter,
+            "target_lang_dict": target_lang_dict
+        }
+    
+    submit_job("ftbq_job", localize)
+    st.rerun()
@@ -1,13 +1,15 @@
 import copy
 import time
+import asyncio
 import ftb_snbt_lib as slib
 
 import streamlit as st
 
 from src.constants import MINECRAFT_LANGUAGES, MINECRAFT_TO_GOOGLE, MINECRAFT_TO_DEEPL
 from src.converter import SNBTConverter
-from src.translator import GoogleTranslator, DeepLTranslator, GeminiTranslator
-from src.utils import Message, read_file, check_deepl_key, check_gemini_key, generate_task_key, schedule_task, process_tasks
+from src.translator import get_translator
+from src.jobs import Job
+from src.utils import Message, read_file, check_deepl_key, check_gemini_key, cache_output, get_translation_memory, submit_job, get_job, show_job
 
 Message("ftbq_new_title").title()
 st.page_link(
@@ -20,6 +22,35 @@ st.divider()
 
 Message("ftbq_new_readme").info()
 
+job = get_job("ftbq_new_job")
+if job is not None and show_job(job):
+    result = job.result()
+    with st.container(border=True):
+        Message("downloads_header").subheader()
+        
+        source_lang_filename = f"{result['source_lang']}.snbt"
+        source_lang_download = st.download_button(
+            label = source_lang_filename,
+            data = cache_output(job.id, source_lang_filename, lambda: slib.dumps(result["snbt_converter"].convert_json_to_snbt(result["source_lang_dict"]))),
+            file_name = source_lang_filename,
+            on_click = "ignore",
+            mime = "text/plain"
+        )
+        
+        target_lang_filename = f"{result['target_lang']}.snbt"
+        target_lang_download = st.download_button(
+            label = target_lang_filename,
+            data = cache_output(job.id, target_lang_filename, lambda: slib.dumps(result["snbt_converter"].convert_json_to_snbt(result["target_lang_dict"]))),
+            file_name = target_lang_filename,
+            on_click = "ignore",
+            mime = "text/plain"
+        )
+
+    with st.container(border=True):
+        Message("user_guide_header").subheader()
+
+        Message("user_guide_ftbq_new", source_lang=result["source_lang"], target_lang=result["target_lang"]).send()
+
 with st.container(border=True):
     Message("upload_lang_header").subheader()
     lang_file = st.file_uploader(
@@ -46,7 +77,7 @@ with st.container(border=True):
     match translator_service:
         case "Google":
             lang_list = list(MINECRAFT_TO_GOOGLE)
-            translator = GoogleTranslator()
+            translator = get_translator("Google", memory=get_translation_memory())
         case "DeepL":
             deepl_key = st.session_state.deepl_key
             if not deepl_key:
@@ -54,14 +85,14 @@ with st.container(border=True):
             if not check_deepl_key(deepl_key):
                 Message("api_key_invalid", stop=True).error()
             lang_list = list(MINECRAFT_TO_DEEPL)
-            translator = DeepLTranslator(auth_key=deepl_key)
+            translator = get_translator("DeepL", deepl_key, memory=get_translation_memory())
         case "Gemini":
             gemini_key = st.session_state.gemini_key
             if not gemini_key:
                 Message("api_key_empty", stop=True).info()
             if not check_gemini_key(gemini_key):
                 Message("api_key_invalid", stop=True).error()
-            translator = GeminiTranslator(auth_key=gemini_key)
+            translator = get_translator("Gemini", gemini_key, memory=get_translation_memory())
 
     source_lang = st.selectbox(
         label = Message("select_source_lang_label").text,
@@ -85,69 +116,36 @@ button = st.button(
     type = "primary",
     use_container_width = True,
     key = "running",
-    disabled = st.session_state.get("running", False)
+    disabled = st.session_state.get("running", False) or (job is not None and not job.done())
 )
 
 if button:
     with st.spinner("Loading...", show_time=True):
         time.sleep(3)
     
-    status = st.status(
-        label = Message("status_in_progress").text,
-        expanded = True
-    )
-
-    try:
-        Message("status_step_1", st_container=status).send()
+    step_1 = Message("status_step_1").text
+    step_2 = Message("status_step_2").text
+    lang_text = read_file(lang_file)
+    
+    async def localize(job: Job) -> dict:
+        job.status.write(step_1)
         snbt_converter = SNBTConverter()
-        source_lang_dict = snbt_converter.convert_snbt_to_json(slib.loads(read_file(lang_file)))
-        target_lang_dict = copy.deepcopy(source_lang_dict)
-            
-        Message("status_step_2", st_container=status).send()
+        source_lang_dict = await asyncio.to_thread(lambda: snbt_converter.convert_snbt_to_json(slib.loads(lang_text)))
+        target_lang_dict = await asyncio.to_thread(copy.deepcopy, source_lang_dict)
+        
+        job.status.write(step_2)
         if source_lang_dict:
-            task_key = f"task-{generate_task_key(time.time())}"
-            schedule_task(
-                task_key,
-                translator.translate(source_lang_dict, target_lang_dict, target_lang, status)
+            await translator.translate(
+                source_lang_dict, target_lang_dict, target_lang, job.status, source_lang=source_lang,
+                on_partial=job.snapshot(f"{target_lang}.snbt", "text/plain", lambda: slib.dumps(snbt_converter.convert_json_to_snbt(target_lang_dict)))
             )
-            process_tasks()
-    except Exception as e:
-        status.update(
-            label = Message("status_error").text,
-            state = "error"
-        )
-        status.error(f"An error occurred while localizing: {e}")
-        st.stop()
-    finally:
-        del st.session_state.tasks[task_key]
-
-    status.update(
-        label = Message("status_done").text,
-        state = "complete"
-    )
+        return {
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "snbt_converter": snbt_converter,
+            "source_lang_dict": source_lang_dict,
+            "target_lang_dict": target_lang_dict
+        }
     
-    with st.container(border=True):
-        Message("downloads_header").subheader()
-        
-        source_lang_filename = f"{source_lang}.snbt"
-        source_lang_download = st.download_button(
-            label = source_lang_filename,
-            data = slib.dumps(snbt_converter.convert_json_to_snbt(source_lang_dict)),
-            file_name = source_lang_filename,
-            on_click = "ignore",
-            mime = "text/plain"
-        )
-        
-        target_lang_filename = f"{target_lang}.snbt"
-        target_lang_download = st.download_button(
-            label = target_lang_filename,
-            data = slib.dumps(snbt_converter.convert_json_to_snbt(target_lang_dict)),
-            file_name = target_lang_filename,
-            on_click = "ignore",
-            mime = "text/plain"
-        )
-
-    with st.container(border=True):
-        Message("user_guide_header").subheader()
-
-        Message("user_guide_ftbq_new", source_lang=source_lang, target_lang=target_lang).send()
\ No newline at end of file
+    submit_job("ftbq_new_job", localize)
+    st.rerun()
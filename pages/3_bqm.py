@@ -1,13 +1,14 @@
 import copy
 import time
-import json
+import asyncio
 
 import streamlit as st
 
 from src.constants import MINECRAFT_LANGUAGES, MINECRAFT_TO_GOOGLE, MINECRAFT_TO_DEEPL
 from src.converter import BQMQuestConverter, LANGConverter
-from src.translator import GoogleTranslator, DeepLTranslator, GeminiTranslator
-from src.utils import Message, read_file, check_deepl_key, check_gemini_key, generate_task_key, schedule_task, process_tasks
+from src.translator import get_translator
+from src.jobs import Job
+from src.utils import Message, read_file, check_deepl_key, check_gemini_key, cache_output, get_translation_memory, submit_job, get_job, show_job
 
 Message("bqm_title").title()
 st.page_link(
@@ -20,6 +21,50 @@ st.divider()
 
 Message("bqm_readme").info()
 
+job = get_job("bqm_job")
+if job is not None and show_job(job):
+    result = job.result()
+    with st.container(border=True):
+        Message("downloads_header").subheader()
+        
+        if result["do_convert"]:
+            quest_filename = "DefaultQuests.json"
+            quest_download = st.download_button(
+                label = quest_filename,
+                data = cache_output(job.id, quest_filename, lambda: result["converted_quest_arr"][0][1].getvalue()),
+                file_name = quest_filename,
+                on_click = "ignore",
+                mime = "application/json"
+            )
+            
+            source_lang_filename = f"{result['source_lang']}.lang"
+            source_lang_download = st.download_button(
+                label = source_lang_filename,
+                data = cache_output(job.id, source_lang_filename, lambda: result["lang_converter"].convert_json_to_lang(result["converter"].lang_dict)),
+                file_name = source_lang_filename,
+                on_click = "ignore",
+                mime = "text/plain"
+            )
+        
+        if result["do_translate"]:
+            target_lang_filename = f"{result['target_lang']}.lang"
+            target_lang_download = st.download_button(
+                label = target_lang_filename,
+                data = cache_output(job.id, target_lang_filename, lambda: result["lang_converter"].convert_json_to_lang(result["target_lang_dict"])),
+                file_name = target_lang_filename,
+                on_click = "ignore",
+                mime = "text/plain"
+            )
+
+    with st.container(border=True):
+        Message("user_guide_header").subheader()
+
+        Message("user_guide_bqm_1").send()
+        if result["do_translate"]:
+            Message("user_guide_bqm_2", source_lang=result["source_lang"], target_lang=result["target_lang"]).send()
+        else:
+            Message("user_guide_bqm_3", source_lang=result["source_lang"]).send()
+
 with st.form("task_form"):
     Message("modpack_name_header").subheader()
     modpack_name = st.text_input(
@@ -114,7 +159,7 @@ with st.container(border=True):
         match translator_service:
             case "Google":
                 lang_list = list(MINECRAFT_TO_GOOGLE)
-                translator = GoogleTranslator()
+                translator = get_translator("Google", memory=get_translation_memory())
             case "DeepL":
                 deepl_key = st.session_state.deepl_key
                 if not deepl_key:
@@ -122,14 +167,14 @@ with st.container(border=True):
                 if not check_deepl_key(deepl_key):
                     Message("api_key_invalid", stop=True).error()
                 lang_list = list(MINECRAFT_TO_DEEPL)
-                translator = DeepLTranslator(auth_key=deepl_key)
+                translator = get_translator("DeepL", deepl_key, memory=get_translation_memory())
             case "Gemini":
                 gemini_key = st.session_state.gemini_key
                 if not gemini_key:
                     Message("api_key_empty", stop=True).info()
                 if not check_gemini_key(gemini_key):
                     Message("api_key_invalid", stop=True).error()
-                translator = GeminiTranslator(auth_key=gemini_key)
+                translator = get_translator("Gemini", gemini_key, memory=get_translation_memory())
 
     source_lang = st.selectbox(
         label = Message("select_source_lang_label").text,
@@ -157,90 +202,49 @@ button = st.button(
     type = "primary",
     use_container_width = True,
     key = "running",
-    disabled = st.session_state.get("running", False)
+    disabled = st.session_state.get("running", False) or (job is not None and not job.done())
 )
 
 if button:
     with st.spinner("Loading...", show_time=True):
         time.sleep(3)
     
-    status = st.status(
-        label = Message("status_in_progress").text,
-        expanded = True
-    )
-
-    lang_converter = LANGConverter()
-    source_lang_dict = lang_converter.convert_lang_to_json(read_file(lang_file)) if st.session_state.lang_exists else {}
-    target_lang_dict = copy.deepcopy(source_lang_dict)
+    do_convert = st.session_state.do_convert
+    do_translate = st.session_state.do_translate
+    target_lang = target_lang if do_translate else None
+    step_1 = Message("status_step_1").text
+    step_2 = Message("status_step_2").text
+    lang_text = read_file(lang_file) if st.session_state.lang_exists else None
     
-    try:
-        if st.session_state.do_convert:
-            Message("status_step_1", st_container=status).send()
-            converter = BQMQuestConverter(modpack_name, quest_files)
+    async def localize(job: Job) -> dict:
+        lang_converter = LANGConverter()
+        source_lang_dict = await asyncio.to_thread(lang_converter.convert_lang_to_json, lang_text) if lang_text is not None else {} # off the shared job loop
+        target_lang_dict = await asyncio.to_thread(copy.deepcopy, source_lang_dict)
+        converter = None
+        converted_quest_arr = None
+        if do_convert:
+            job.status.write(step_1)
+            converter = await asyncio.to_thread(BQMQuestConverter, modpack_name, quest_files, streaming=True)
             converter.lang_dict.update(source_lang_dict)
-            converted_quest_arr, source_lang_dict = converter.convert()
-            
-        if st.session_state.do_translate:
-            Message("status_step_2", st_container=status).send()
+            converted_quest_arr, source_lang_dict = await asyncio.to_thread(converter.convert)
+        
+        if do_translate:
+            job.status.write(step_2)
             if source_lang_dict:
-                task_key = f"task-{generate_task_key(time.time())}"
-                schedule_task(
-                    task_key,
-                    translator.translate(source_lang_dict, target_lang_dict, target_lang, status)
+                await translator.translate(
+                    source_lang_dict, target_lang_dict, target_lang, job.status, source_lang=source_lang,
+                    on_partial=job.snapshot(f"{target_lang}.lang", "text/plain", lambda: lang_converter.convert_json_to_lang(target_lang_dict))
                 )
-                process_tasks()
-    except Exception as e:
-        status.update(
-            label = Message("status_error").text,
-            state = "error"
-        )
-        status.error(f"An error occurred while localizing: {e}")
-        st.stop()
-    finally:
-        del st.session_state.tasks[task_key]
-
-    status.update(
-        label = Message("status_done").text,
-        state = "complete"
-    )
+        return {
+            "do_convert": do_convert,
+            "do_translate": do_translate,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "lang_converter": lang_converter,
+            "converter": converter,
+            "converted_quest_arr": converted_quest_arr,
+            "target_lang_dict": target_lang_dict
+        }
     
-    with st.container(border=True):
-        Message("downloads_header").subheader()
-        
-        if st.session_state.do_convert:
-            quest_filename = "DefaultQuests.json"
-            quest_download = st.download_button(
-                label = quest_filename,
-                data = json.dumps(converted_quest_arr[0], indent=4, ensure_ascii=False),
-                file_name = quest_filename,
-                on_click = "ignore",
-                mime = "application/json"
-            )
-            
-            source_lang_filename = f"{source_lang}.lang"
-            source_lang_download = st.download_button(
-                label = source_lang_filename,
-                data = lang_converter.convert_json_to_lang(converter.lang_dict),
-                file_name = source_lang_filename,
-                on_click = "ignore",
-                mime = "text/plain"
-            )
-        
-        if st.session_state.do_translate:
-            target_lang_filename = f"{target_lang}.lang"
-            target_lang_download = st.download_button(
-                label = target_lang_filename,
-                data = lang_converter.convert_json_to_lang(target_lang_dict),
-                file_name = target_lang_filename,
-                on_click = "ignore",
-                mime = "text/plain"
-            )
-
-    with st.container(border=True):
-        Message("user_guide_header").subheader()
-
-        Message("user_guide_bqm_1").send()
-        if st.session_state.do_translate:
-            Message("user_guide_bqm_2", source_lang=source_lang, target_lang=target_lang).send()
-        else:
-            Message("user_guide_bqm_3", source_lang=source_lang).send()
\ No newline at end of file
+    submit_job("bqm_job", localize)
+    st.rerun()
@@ -6,8 +6,9 @@ import ftb_snbt_lib as slib
 
 from src.constants import MINECRAFT_LANGUAGES, MINECRAFT_TO_GOOGLE, MINECRAFT_TO_DEEPL
 from src.converter import SNBTConverter
-from src.translator import GoogleTranslator, DeepLTranslator, GeminiTranslator
-from src.utils import Message, read_file, check_deepl_key, check_gemini_key, generate_task_key, schedule_task, process_tasks
+from src.translator import get_translator
+from src.jobs import Job
+from src.utils import Message, read_file, check_deepl_key, check_gemini_key, dump_json, cache_output, get_translation_memory, submit_job, get_job, show_job
 
 Message("translation_fixer_title").title()
 st.page_link(
@@ -18,6 +19,31 @@ st.page_link(
 
 Message("translation_fixer_readme").info()
 
+job = get_job("translation_fixer_job")
+if job is not None and show_job(job):
+    result = job.result()
+    with st.container(border=True):
+        Message("downloads_header").subheader()
+        
+        if result["lang_type"] == "json":
+            target_lang_filename = f"{result['target_lang']}.json"
+            target_lang_download = st.download_button(
+                label = target_lang_filename,
+                data = cache_output(job.id, target_lang_filename, lambda: dump_json(result["data"])),
+                file_name = target_lang_filename,
+                on_click = "ignore",
+                mime = "application/json"
+            )
+        elif result["lang_type"] == "snbt":
+            target_lang_filename = f"{result['target_lang']}.snbt"
+            target_lang_download = st.download_button(
+                label = target_lang_filename,
+                data = cache_output(job.id, target_lang_filename, lambda: slib.dumps(result["snbt_converter"].convert_json_to_snbt(result["data"]))),
+                file_name = target_lang_filename,
+                on_click = "ignore",
+                mime = "text/plain"
+            )
+
 with st.form("lang_form"):
     Message("lang_check_header").subheader()
     lang_type = st.radio(
@@ -59,7 +85,7 @@ with st.container(border=True):
     match translator_service:
         case "Google":
             lang_list = list(MINECRAFT_TO_GOOGLE)
-            translator = GoogleTranslator()
+            translator = get_translator("Google", memory=get_translation_memory())
         case "DeepL":
             deepl_key = st.session_state.deepl_key
             if not deepl_key:
@@ -67,14 +93,14 @@ with st.container(border=True):
             if not check_deepl_key(deepl_key):
                 Message("api_key_invalid", stop=True).error()
             lang_list = list(MINECRAFT_TO_DEEPL)
-            translator = DeepLTranslator(auth_key=deepl_key)
+            translator = get_translator("DeepL", deepl_key, memory=get_translation_memory())
         case "Gemini":
             gemini_key = st.session_state.gemini_key
             if not gemini_key:
                 Message("api_key_empty", stop=True).info()
             if not check_gemini_key(gemini_key):
                 Message("api_key_invalid", stop=True).error()
-            translator = GeminiTranslator(auth_key=gemini_key)
+            translator = get_translator("Gemini", gemini_key, memory=get_translation_memory())
     
     target_lang = st.selectbox(
         label = Message("select_target_lang_label").text,
@@ -114,58 +140,21 @@ button = st.button(
     type = "primary",
     use_container_width = True,
     key = "running",
-    disabled = st.session_state.get("running", False)
+    disabled = st.session_state.get("running", False) or (job is not None and not job.done())
 )
 
 if button:
     with st.spinner("Loading...", show_time=True):
         time.sleep(3)
     
-    status = st.status(
-        label = Message("status_in_progress").text,
-        expanded = True
-    )
+    async def localize(job: Job) -> dict:
+        await translator.translate(selection, data, target_lang, job.status)
+        return {
+            "lang_type": lang_type,
+            "target_lang": target_lang,
+            "snbt_converter": snbt_converter if lang_type == "snbt" else None,
+            "data": data
+        }
     
-    try:
-        task_key = f"task-{generate_task_key(time.time())}"
-        schedule_task(
-            task_key,
-            translator.translate(selection, data, target_lang, status)
-        )
-        process_tasks()
-    except Exception as e:
-        status.update(
-            label = Message("status_error").text,
-            state = "error"
-        )
-        status.error(f"An error occurred while localizing: {e}")
-        st.stop()
-    finally:
-        del st.session_state.tasks[task_key]
-    
-    status.update(
-        label = Message("status_done").text,
-        state = "complete"
-    )
-    
-    with st.container(border=True):
-        Message("downloads_header").subheader()
-        
-        if lang_type == "json":
-            target_lang_filename = f"{target_lang}.json"
-            target_lang_download = st.download_button(
-                label = target_lang_filename,
-                data = json.dumps(data, indent=4, ensure_ascii=False),
-                file_name = target_lang_filename,
-                on_click = "ignore",
-                mime = "application/json"
-            )
-        elif lang_type == "snbt":
-            target_lang_filename = f"{target_lang}.snbt"
-            target_lang_download = st.download_button(
-                label = target_lang_filename,
-                data = slib.dumps(snbt_converter.convert_json_to_snbt(data)),
-                file_name = target_lang_filename,
-                on_click = "ignore",
-                mime = "text/plain"
-            )
\ No newline at end of file
+    submit_job("translation_fixer_job", localize)
+    st.rerun()
@@ -1,6 +1,10 @@
 __all__ = [
+    "callbacks",
     "constants",
     "converter",
+    "jobs",
+    "memory",
+    "snbt",
     "translator",
     "utils"
 ]
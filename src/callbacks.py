@@ -0,0 +1,23 @@
+import logging
+
+from langchain_core.callbacks.base import BaseCallbackHandler
+
+from src.utils import get_session_id
+
+class LLMCallbackHandler(BaseCallbackHandler):
+    def __init__(self, cls_name, *args, **kwargs):
+        self.cls_name = cls_name
+        super().__init__(*args, **kwargs)
+
+    @property
+    def logger(self) -> logging.Logger:
+        return logging.getLogger(f"{self.cls_name} ({get_session_id()})")
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.logger.info("LLM started: %s", serialized)
+
+    def on_llm_error(self, error, **kwargs):
+        self.logger.error("LLM error: %s", error)
+
+    def on_retry(self, retry_state, **kwargs):
+        self.logger.warning("LLM retrying: %s", retry_state)
@@ -1,12 +1,13 @@
-import os
 import json
-from googletrans.constants import LANGUAGES
 
-MESSAGES = dict()
-for filename in os.listdir("lang"):
-    base, ext = os.path.splitext(filename)
-    if ext == ".json":
-        MESSAGES[base] = json.load(open(f"lang/{filename}", "r", encoding="utf-8-sig"))
+class _Messages(dict):
+    """UI messages by language, each read from `lang/` on first use."""
+    def __missing__(self, language: str) -> dict:
+        with open(f"lang/{language}.json", "r", encoding="utf-8-sig") as f:
+            messages = self[language] = json.load(f)
+        return messages
+
+MESSAGES = _Messages()
 
 MINECRAFT_LOCALES = [
     "af_za",
@@ -371,6 +372,8 @@ MINECRAFT_TO_DEEPL = {
 }
 
 if __name__ == "__main__":
+    from googletrans.constants import LANGUAGES
+
     MINECRAFT_LANGUAGES = dict()
     MINECRAFT_TO_GOOGLE = dict()
     for lang in MINECRAFT_LOCALES:
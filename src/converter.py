@@ -1,21 +1,95 @@
 import re
 import os
 import json
+import codecs
+import pickle
+import time
+import hashlib
 import logging
+import tempfile
 import ftb_snbt_lib as slib
 
 from abc import abstractmethod
+from typing import NamedTuple
 from io import BytesIO
-from zipfile import ZipFile
+from typing import BinaryIO, Iterable, Iterator, TextIO
+from itertools import islice
+from zipfile import ZipFile, ZIP_DEFLATED
+from concurrent.futures import ProcessPoolExecutor
 from ftb_snbt_lib import tag
+from src import __version__
 from src.utils import read_file, get_session_id
+from src.snbt import pickle_tag, loads_snbt, dumps_snbt, pool_context
+
+QUEST_MANIFEST_DIR = os.path.join(".cache", "manifests")
+QUEST_MANIFEST_TTL = 30 * 24 * 60 * 60 # seconds, long enough to span a few pack updates
+PARALLEL_MIN_QUESTS = 8 # below this, process startup costs more than it saves (see benchmarks/bench_parse.py)
+
+TRANSLATABLE_FIELDS = frozenset(("title", "subtitle", "description"))
+
+class StringSlot(NamedTuple):
+    """A translatable string in a quest tree: its lang key and where it lives (`container[field]`)."""
+    lang_key: str
+    container: tag.Compound | tag.List
+    field: str | int
+
+class QuestManifest:
+    """On-disk record of converted quest files, keyed by quest name and content digest.
+    
+    Each entry keeps the lang entries and the converted SNBT a quest file produced, so an unchanged
+    file can be skipped entirely on the next run. Entries from another app version are discarded,
+    and manifests untouched for QUEST_MANIFEST_TTL are removed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.quests = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == __version__:
+                self.quests = manifest["quests"]
+
+    @staticmethod
+    def path_for(modpack_name: str, directory: str = QUEST_MANIFEST_DIR) -> str:
+        """Manifest of a modpack, shared by every session converting a modpack of that name."""
+        digest = hashlib.blake2b(modpack_name.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(directory, f"{digest}.json")
+
+    def get(self, quest_name: str, digest: str) -> dict | None:
+        entry = self.quests.get(quest_name)
+        if entry is None or entry["digest"] != digest:
+            return None
+        return entry
+
+    def put(self, quest_name: str, digest: str, lang_dict: dict, snbt: str):
+        self.quests[quest_name] = {"digest": digest, "lang": lang_dict, "snbt": snbt}
+
+    def save(self, quest_names: list[str]):
+        """Write the manifest, dropping quests that were not part of this run."""
+        self.quests = {quest_name: self.quests[quest_name] for quest_name in quest_names if quest_name in self.quests}
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._prune(directory)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory) # sessions converting the same modpack write their own
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": __version__, "quests": self.quests}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _prune(self, directory: str):
+        expiry = time.time() - QUEST_MANIFEST_TTL
+        for entry in os.scandir(directory):
+            try:
+                if entry.path != self.path and entry.stat().st_mtime < expiry:
+                    os.remove(entry.path)
+            except OSError:
+                pass # removed by another session
 
 class QuestConverter():
     def __init__(self, modpack_name: str, quest_arr: list[BytesIO]):
         self.logger = logging.getLogger(f"{self.__class__.__qualname__} ({get_session_id()})")
         
         self.modpack_name = modpack_name
-        self.quest_arr = [self._read(quest) for quest in quest_arr]
+        self.quest_arr = self._read_all(quest_arr)
         self.lang_dict = {}
         
         self.logger.info("Initialized")
@@ -25,44 +99,160 @@ class QuestConverter():
     def _read(quest: BytesIO) -> tuple:
         pass
     
+    def _read_all(self, quest_arr: list[BytesIO]) -> list[tuple]:
+        return [self._read(quest) for quest in quest_arr]
+    
     def convert(self) -> tuple[list, dict]:
         self.logger.info("Converted %s quests", len(self.quest_arr))
 
 class FTBQuestConverter(QuestConverter):
+    def __init__(self, modpack_name: str, quest_arr: list[BytesIO], parallel: bool = False, max_workers: int | None = None, manifest_path: str | None = None):
+        """Pass `manifest_path` to convert incrementally: quest files whose content is unchanged since
+        the last run with the same manifest are neither parsed nor walked again."""
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.manifest = QuestManifest(manifest_path) if manifest_path else None
+        self.digests = {}
+        self.cached_quests = {} # quest name -> upload, for quests served from the manifest
+        self.snbt_cache = {}
+        super().__init__(modpack_name, quest_arr)
+    
+    @staticmethod
+    def _get_quest_name(quest: BytesIO) -> str:
+        return re.compile(r'\W+').sub("", os.path.splitext(quest.name)[0].lower().replace(" ", "_"))
+    
+    @staticmethod
+    def _check(quest_data: tag.Base) -> tag.Compound:
+        if not isinstance(quest_data, tag.Compound):
+            raise TypeError("The quest data must be a Compound tag object")
+        return quest_data
+    
     @staticmethod
     def _read(quest: BytesIO) -> tuple[str, tag.Compound]:
-        quest_name = re.compile(r'\W+').sub("", os.path.splitext(quest.name)[0].lower().replace(" ", "_"))
+        quest_name = FTBQuestConverter._get_quest_name(quest)
         
         quest_data = read_file(quest)
         quest_data = slib.loads(quest_data)
-        if not isinstance(quest_data, tag.Compound):
-            raise TypeError("The quest data must be a Compound tag object")
         
-        return quest_name, quest_data
+        return quest_name, FTBQuestConverter._check(quest_data)
     
-    def convert(self) -> tuple[list, dict]:
-        for quest_name, quest_data in self.quest_arr:
+    def _digest(self, quest_name: str, quest: BytesIO) -> str:
+        digest = hashlib.sha256(f"{self.modpack_name}\0{quest_name}\0".encode())
+        with quest.getbuffer() as buffer:
+            digest.update(buffer)
+        return digest.hexdigest()
+    
+    def _read_all(self, quest_arr: list[BytesIO]) -> list[tuple[str, tag.Compound | None]]:
+        if self.manifest is None:
+            return self._parse_all(quest_arr)
+        
+        quest_names = []
+        pending = []
+        for quest in quest_arr:
+            quest_name = self._get_quest_name(quest)
+            self.digests[quest_name] = self._digest(quest_name, quest)
+            if self.manifest.get(quest_name, self.digests[quest_name]) is not None:
+                self.cached_quests[quest_name] = quest
+            else:
+                pending.append(quest)
+            quest_names.append(quest_name)
+        self.logger.info("Skipping %d unchanged quests", len(self.cached_quests))
+        
+        parsed = iter(self._parse_all(pending))
+        return [(quest_name, None) if quest_name in self.cached_quests else next(parsed) for quest_name in quest_names]
+    
+    def _use_pool(self, quest_count: int) -> bool:
+        return self.parallel and quest_count >= PARALLEL_MIN_QUESTS and (os.cpu_count() or 1) > 1
+    
+    def _parse_all(self, quest_arr: list[BytesIO]) -> list[tuple[str, tag.Compound]]:
+        if not self._use_pool(len(quest_arr)):
+            return super()._read_all(quest_arr)
+        
+        self.logger.info("Parsing %d quests in parallel", len(quest_arr))
+        quest_names = [self._get_quest_name(quest) for quest in quest_arr]
+        quest_data_arr = [read_file(quest) for quest in quest_arr]
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=pool_context()) as executor: # never fork the threaded server
+            quest_data_arr = list(executor.map(loads_snbt, quest_data_arr)) # map keeps upload order
+        
+        return [(quest_name, self._check(pickle.loads(quest_data))) for quest_name, quest_data in zip(quest_names, quest_data_arr)]
+    
+    def convert(self, in_place: bool = False) -> tuple[list, dict]:
+        self.slot_index = []
+        for idx, (quest_name, quest_data) in enumerate(self.quest_arr):
+            if quest_data is None and not in_place:
+                self.logger.info("Reusing converted quest (%s)", quest_name)
+                entry = self.manifest.get(quest_name, self.digests[quest_name])
+                self.lang_dict.update(entry["lang"])
+                self.snbt_cache[quest_name] = entry["snbt"]
+                continue
+            if quest_data is None: # the manifest holds no slots, so in-place conversion needs the tree after all
+                quest_data = self._read(self.cached_quests.pop(quest_name))[1]
+                self.quest_arr[idx] = (quest_name, quest_data)
+            
             self.logger.info("Converting quest (%s)", quest_name)
-            self._convert(quest_data, f"{self.modpack_name}.{quest_name}")
+            slot_count = len(self.slot_index)
+            self._convert(quest_data, f"{self.modpack_name}.{quest_name}", in_place)
+            if self.manifest is not None and not in_place:
+                self.snbt_cache[quest_name] = slib.dumps(quest_data)
+                lang_dict = {slot.lang_key: self.lang_dict[slot.lang_key] for slot in self.slot_index[slot_count:]}
+                self.manifest.put(quest_name, self.digests[quest_name], lang_dict, self.snbt_cache[quest_name])
+        
+        if self.manifest is not None and not in_place:
+            self.manifest.save([quest_name for quest_name, _ in self.quest_arr])
         super().convert()
         return self.quest_arr, self.lang_dict
     
-    def _convert(self, quest_data: tag.Compound, lang_key: str):
-        for element in filter(lambda x: quest_data[x], quest_data):
-            if isinstance(quest_data[element], tag.Compound):
-                self._convert(quest_data[element], f"{lang_key}.{element}")
-            elif isinstance(quest_data[element],tag.List) and issubclass(quest_data[element].subtype, tag.Compound):
-                for idx in range(len(quest_data[element])):
-                    self._convert(quest_data[element][idx], f"{lang_key}.{element}{idx}")
-            
-            if element in ("title", "subtitle", "description"):
-                if isinstance(quest_data[element], tag.String) and self._filter(quest_data[element]):
-                    self.lang_dict[f"{lang_key}.{element}"] = self._escape(quest_data[element])
-                    quest_data[element] = tag.String(f"{{{lang_key}.{element}}}")
-                elif isinstance(quest_data[element], tag.List) and issubclass(quest_data[element].subtype, tag.String):
-                    for lang_idx, data_idx in enumerate(filter(lambda x: self._filter(quest_data[element][x]), range(len(quest_data[element])))):
-                        self.lang_dict[f"{lang_key}.{element}{lang_idx}"] = self._escape(quest_data[element][data_idx])
-                        quest_data[element][data_idx] = tag.String(f"{{{lang_key}.{element}{lang_idx}}}")
+    def _convert(self, quest_data: tag.Compound, lang_key: str, in_place: bool = False):
+        slots = self._index(quest_data, lang_key)
+        for slot_key, container, field in slots:
+            self.lang_dict[slot_key] = self._escape(container[field])
+            if not in_place: # in-place mode keeps the text and only records where it lives
+                container[field] = tag.String(f"{{{slot_key}}}")
+        self.slot_index.extend(slots)
+    
+    def apply(self, lang_dict: dict) -> list[tuple[str, tag.Compound]]:
+        """Write the values of `lang_dict` straight into the quests recorded by `convert(in_place=True)`.
+        
+        Every slot is rewritten, falling back to the source text for missing keys, so the same
+        converter can be applied and compressed once per target language without parsing again.
+        """
+        for slot_key, container, field in self.slot_index:
+            value = lang_dict.get(slot_key)
+            if not isinstance(value, str):
+                value = self.lang_dict[slot_key]
+            container[field] = tag.String(self._unescape(value))
+        self.logger.info("Applied %d strings to quests", len(self.slot_index))
+        return self.quest_arr
+    
+    @classmethod
+    def _index(cls, quest_data: tag.Compound, lang_key: str) -> list[StringSlot]:
+        """Walk the quest tree once and return its translatable string slots in lang file order."""
+        slots = []
+        stack = [(lang_key, quest_data, iter(quest_data.items()))]
+        while stack:
+            lang_key, node, items = stack[-1]
+            for element, value in items:
+                value_type = type(value) # parsed trees only hold the exact tag classes, so identity checks are safe
+                if value_type is tag.String:
+                    if element in TRANSLATABLE_FIELDS and cls._filter(value):
+                        slots.append(StringSlot(f"{lang_key}.{element}", node, element))
+                elif value_type is tag.Compound:
+                    stack.append((f"{lang_key}.{element}", value, iter(value.items())))
+                    break
+                elif issubclass(value_type, tag.List) and value:
+                    subtype = value_type.subtype
+                    if subtype is tag.Compound:
+                        stack.extend((f"{lang_key}.{element}{idx}", value[idx], iter(value[idx].items())) for idx in range(len(value) - 1, -1, -1))
+                        break
+                    if subtype is tag.String and element in TRANSLATABLE_FIELDS:
+                        lang_idx = 0
+                        for data_idx, quest_str in enumerate(value):
+                            if cls._filter(quest_str):
+                                slots.append(StringSlot(f"{lang_key}.{element}{lang_idx}", value, data_idx))
+                                lang_idx += 1
+            else:
+                stack.pop()
+        return slots
     
     @staticmethod
     def _filter(quest_str: tag.String) -> bool:
@@ -80,18 +270,132 @@ class FTBQuestConverter(QuestConverter):
             quest_str = quest_str.replace(match, seq)
         return quest_str
     
-    def compress(self, dir: str, filename: str) -> str:
-        zip_dir = os.path.join(dir, filename)
-        with ZipFile(zip_dir, "w") as zip_file:
+    @staticmethod
+    def _unescape(lang_str: str) -> str:
+        for match, seq in ((r'\"', r'"'), (r'%%', r'%')):
+            lang_str = lang_str.replace(match, seq)
+        return lang_str
+    
+    def _dumps_all(self) -> Iterator[tuple[str, str]]:
+        """Yield (quest_name, snbt) in quest order, serializing in a process pool when it pays off."""
+        pending = [quest_data for quest_name, quest_data in self.quest_arr if quest_name not in self.snbt_cache]
+        if not self._use_pool(len(pending)):
             for quest_name, quest_data in self.quest_arr:
-                zip_file.writestr(f"{quest_name}.snbt", slib.dumps(quest_data))
-        return zip_dir
+                yield quest_name, self.snbt_cache.get(quest_name) or slib.dumps(quest_data)
+            return
+        
+        self.logger.info("Serializing %d quests in parallel", len(pending))
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=pool_context()) as executor: # never fork the threaded server
+            dumped = executor.map(dumps_snbt, map(pickle_tag, pending)) # map keeps quest order
+            for quest_name, _ in self.quest_arr:
+                yield quest_name, self.snbt_cache.get(quest_name) or next(dumped)
+    
+    def compress(self, compression: int = ZIP_DEFLATED, compresslevel: int | None = None) -> BytesIO:
+        """Build quests.zip in memory; `compression` and `compresslevel` are passed to ZipFile."""
+        buffer = BytesIO()
+        with ZipFile(buffer, "w", compression=compression, compresslevel=compresslevel) as zip_file:
+            for quest_name, snbt in self._dumps_all():
+                zip_file.writestr(f"{quest_name}.snbt", snbt)
+        buffer.seek(0)
+        return buffer
+
+class _JSONStream:
+    """Pull reader that decodes a UTF-8 JSON document one value at a time from a binary file object."""
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    DECODER = json.JSONDecoder()
+
+    def __init__(self, fp: BinaryIO, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(max(self.chunk_size, len(self.buffer) - self.pos)) # grow geometrically for large values
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk, final=not chunk)
+        self.pos = 0
+        self.eof = not chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, or '' at the end of the document."""
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in the quest data")
+        self.pos += 1
+
+    def _next_separator(self, close: str) -> bool:
+        char = self.peek()
+        self.pos += 1
+        if char == close:
+            return False
+        if char != ",":
+            raise ValueError(f"Expected ',' or '{close}' in the quest data")
+        return True
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if end == len(self.buffer) and self._fill(): # a number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of an object; the caller must consume each value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if not self._next_separator("}"):
+                return
+
+    def elements(self) -> Iterator:
+        """Yield the decoded elements of an array one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._next_separator("]"):
+                return
 
 class BQMQuestConverter(QuestConverter):
+    QUEST_KEYS = {"questDatabase:9": 1, "questDatabase": None} # None: version 2 or 3, told apart by the quests
+    QUESTLINE_KEYS = {"questLines:9": 1, "questLines": None}
+    
+    def __init__(self, modpack_name: str, quest_arr: list[BytesIO], streaming: bool = False):
+        """With `streaming`, each file is converted element by element in `convert` instead of being loaded
+        whole, and `quest_arr` holds (quest_version, BytesIO) with the converted DefaultQuests.json,
+        formatted as json.dumps(..., indent=4, ensure_ascii=False) would."""
+        self.streaming = streaming
+        super().__init__(modpack_name, quest_arr)
+    
     @staticmethod
     def _read(quest: BytesIO) -> tuple[int, dict]:
-        quest_data = read_file(quest)
-        quest_data = json.loads(quest_data)
+        quest_data = json.loads(read_file(quest)) # not orjson: it holds more memory and turns ints beyond 64 bits into floats
         if not isinstance(quest_data, dict):
             raise TypeError("The quest data must be a json object")
 
@@ -107,8 +411,17 @@ class BQMQuestConverter(QuestConverter):
         
         return quest_version, quest_data
     
+    def _read_all(self, quest_arr: list[BytesIO]) -> list[tuple[int | None, dict | BytesIO]]:
+        if self.streaming:
+            return [(None, quest) for quest in quest_arr]
+        return super()._read_all(quest_arr)
+    
     def convert(self) -> tuple[list, dict]:
-        for quest_version, quest_data in self.quest_arr:
+        for idx, (quest_version, quest_data) in enumerate(self.quest_arr):
+            if self.streaming:
+                self.logger.info("Converting quest (streaming)")
+                self.quest_arr[idx] = self._convert_stream(quest_data)
+                continue
             self.logger.info("Converting quest (version: %d)", quest_version)
             self._convert(quest_version, quest_data)
         super().convert()
@@ -124,42 +437,96 @@ class BQMQuestConverter(QuestConverter):
                 self._convert_v3(quest_data)
     
     def _convert_v1(self, quest_data: dict):        
-        quest_db = quest_data['questDatabase:9']
-        for quest in quest_db.values():
-            idx = quest.get('questID:3')
-            properties = quest['properties:10']['betterquesting:10']
-            self._update_quest(properties, idx, 'name:8', 'desc:8')
-        
-        questline_db = quest_data['questLines:9']
-        for questline in questline_db.values():
-            idx = questline.get('lineID:3')
-            properties = questline['properties:10']['betterquesting:10']
-            self._update_questline(properties, idx, 'name:8', 'desc:8')
+        for quest in quest_data['questDatabase:9'].values():
+            self._convert_quest(1, quest)
+        
+        for idx, questline in enumerate(quest_data['questLines:9'].values()):
+            self._convert_questline(1, idx, questline)
     
     def _convert_v2(self, quest_data: dict):
-        quest_db = quest_data['questDatabase']
-        for quest in quest_db:
-            idx = quest.get('questID')
-            properties = quest
-            self._update_quest(properties, idx, 'name', 'description')
-        
-        questline_db = quest_data['questLines']
-        for idx, questline in enumerate(questline_db):
-            properties = questline
-            self._update_questline(properties, idx, 'name', 'description')
+        for quest in quest_data['questDatabase']:
+            self._convert_quest(2, quest)
+        
+        for idx, questline in enumerate(quest_data['questLines']):
+            self._convert_questline(2, idx, questline)
             
     def _convert_v3(self, quest_data: dict):
-        quest_db = quest_data['questDatabase']
-        for quest in quest_db:
-            idx = quest.get('questID')
-            properties = quest['properties']['betterquesting']
-            self._update_quest(properties, idx, 'name', 'desc')
-        
-        questline_db = quest_data['questLines']
-        for questline in questline_db:
-            idx = questline.get('lineID')
-            properties = questline['properties']['betterquesting']
-            self._update_questline(properties, idx, 'name', 'desc')
+        for quest in quest_data['questDatabase']:
+            self._convert_quest(3, quest)
+        
+        for idx, questline in enumerate(quest_data['questLines']):
+            self._convert_questline(3, idx, questline)
+    
+    def _convert_quest(self, quest_version: int, quest: dict):
+        match quest_version:
+            case 1:
+                self._update_quest(quest['properties:10']['betterquesting:10'], quest.get('questID:3'), 'name:8', 'desc:8')
+            case 2:
+                self._update_quest(quest, quest.get('questID'), 'name', 'description')
+            case 3:
+                self._update_quest(quest['properties']['betterquesting'], quest.get('questID'), 'name', 'desc')
+    
+    def _convert_questline(self, quest_version: int, idx: int, questline: dict):
+        match quest_version:
+            case 1:
+                self._update_questline(questline['properties:10']['betterquesting:10'], questline.get('lineID:3'), 'name:8', 'desc:8')
+            case 2:
+                self._update_questline(questline, idx, 'name', 'description')
+            case 3:
+                self._update_questline(questline['properties']['betterquesting'], questline.get('lineID'), 'name', 'desc')
+    
+    def _convert_stream(self, quest: BinaryIO) -> tuple[int, BytesIO]:
+        """Convert one DefaultQuests.json while reading it, holding a single quest or questline at a time."""
+        reader = _JSONStream(quest)
+        output = BytesIO()
+        write = lambda text: output.write(text.encode("utf-8"))
+        dumps = lambda value, level: json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n" + "    " * level)
+        
+        quest_version = None
+        questline_lang_dict = {} # questlines go after quests in the lang file, whatever the key order
+        members = 0
+        
+        for key in reader.members():
+            write(",\n" if members else "{\n")
+            write(f"    {json.dumps(key, ensure_ascii=False)}: ")
+            members += 1
+            
+            if key not in self.QUEST_KEYS and key not in self.QUESTLINE_KEYS:
+                write(dumps(reader.value(), 1))
+                continue
+            
+            quest_version = quest_version or self.QUEST_KEYS.get(key) or self.QUESTLINE_KEYS.get(key)
+            is_object = reader.peek() == "{" # version 1 stores databases as objects keyed by index
+            open_char, close_char = ("{", "}") if is_object else ("[", "]")
+            items = ((item_key, reader.value()) for item_key in reader.members()) if is_object else enumerate(reader.elements())
+            
+            count = 0
+            for item_key, item in items:
+                if quest_version is None:
+                    quest_version = 3 if 'properties' in item else 2
+                if key in self.QUEST_KEYS:
+                    self._convert_quest(quest_version, item)
+                else:
+                    lang_dict, self.lang_dict = self.lang_dict, questline_lang_dict
+                    self._convert_questline(quest_version, count, item)
+                    self.lang_dict = lang_dict
+                
+                write(",\n        " if count else f"{open_char}\n        ")
+                if is_object:
+                    write(f"{json.dumps(item_key, ensure_ascii=False)}: ")
+                write(dumps(item, 2))
+                count += 1
+            write(f"\n    {close_char}" if count else f"{open_char}{close_char}")
+        
+        if reader.peek() != "":
+            raise ValueError("Unexpected data after the quest data")
+        if quest_version is None:
+            raise ValueError("The quest data is not a valid format")
+        write("\n}" if members else "{}")
+        
+        self.lang_dict.update(questline_lang_dict)
+        output.seek(0)
+        return quest_version, output
     
     @staticmethod
     def _get_property(properties: dict, name_key: str, desc_key: str) -> tuple[str, str]:
@@ -194,8 +561,25 @@ class TypeConverter:
         self.logger = logging.getLogger(f"{self.__class__.__qualname__} ({get_session_id()})")
 
 class SNBTConverter(TypeConverter):
+    @staticmethod
+    def _to_python(value: tag.Base):
+        """Convert a tag to the plain value json.loads(json.dumps(value)) would give, without the round trip."""
+        if isinstance(value, str):
+            return str(value)
+        if isinstance(value, dict):
+            return {key: SNBTConverter._to_python(val) for key, val in value.items()}
+        if isinstance(value, list):
+            return [SNBTConverter._to_python(val) for val in value]
+        if isinstance(value, float):
+            return float(value)
+        return int(value)
+
+    @staticmethod
+    def _to_snbt_string(value) -> slib.String:
+        return slib.String(value.replace("\n", "\\n")) if isinstance(value, str) else slib.String('')
+
     def convert_snbt_to_json(self, tag: slib.Compound) -> dict:
-        output = json.loads(json.dumps(tag, ensure_ascii=False))
+        output = self._to_python(tag)
         self.logger.info("Converted SNBT to JSON")
         return output
 
@@ -203,30 +587,46 @@ class SNBTConverter(TypeConverter):
         output = slib.Compound()
         for key, value in data.items():
             if isinstance(value, str):
-                output[key] = slib.String(value.replace("\n", "\\n"))
+                output[key] = self._to_snbt_string(value)
             elif isinstance(value, list):
-                output[key]  = slib.List([slib.String('')] * len(value))
-                for idx, val in enumerate(value):
-                    if isinstance(val, str):
-                        output[key][idx] = slib.String(val.replace("\n", "\\n"))
+                output[key] = slib.List([self._to_snbt_string(val) for val in value])
         self.logger.info("Converted JSON to SNBT")
         return output
 
 class LANGConverter(TypeConverter):
-    def convert_lang_to_json(self, data: str) -> dict:
-        output = {}
-        for line in data.splitlines():
+    def parse_lang(self, lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+        """Yield (key, value) pairs from LANG lines, e.g. an open text file, without holding the whole file."""
+        count = 0
+        for line in lines:
+            line = line.rstrip("\r\n")
             if line.startswith("#") or not line:
                 continue
-            key, value = re.compile('(.*)=(.*)').match(line).groups()
-            output[key] = value.replace("%n", r"\n")
+            key, sep, value = line.partition("=") # keys never contain "=", values may
+            if not sep:
+                continue
+            count += 1
+            yield key, value.replace("%n", r"\n")
+        self.logger.info("Parsed %d LANG entries", count)
+
+    def serialize_lang(self, data: dict) -> Iterator[str]:
+        """Yield one LANG line per entry of `data`."""
+        for key, value in data.items():
+            value = value.replace(r"\n", "%n")
+            yield f"{key}={value}\n"
+
+    def write_lang(self, data: dict, fp: TextIO, chunk_size: int = 4096):
+        """Write `data` to `fp` as LANG, `chunk_size` lines per write."""
+        lines = self.serialize_lang(data)
+        while chunk := "".join(islice(lines, chunk_size)):
+            fp.write(chunk)
+        self.logger.info("Wrote JSON as LANG")
+
+    def convert_lang_to_json(self, data: str) -> dict:
+        output = dict(self.parse_lang(data.splitlines()))
         self.logger.info("Converted LANG to JSON")
         return output
 
     def convert_json_to_lang(self, data: dict) -> str:
-        output = ""
-        for key, value in data.items():
-            value = value.replace(r"\n", "%n")
-            output += f"{key}={value}\n"
+        output = "".join(self.serialize_lang(data))
         self.logger.info("Converted JSON to LANG")
-        return output
\ No newline at end of file
+        return output
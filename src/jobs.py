@@ -0,0 +1,157 @@
+import time
+import uuid
+import asyncio
+import logging
+import threading
+import contextvars
+from typing import Any, Awaitable, Callable
+from collections import OrderedDict
+from concurrent.futures import Future, CancelledError
+
+JOB_RETENTION = 60 * 60 # seconds a finished job is kept for its session
+JOB_MAX_FINISHED = 64
+
+SESSION_ID = contextvars.ContextVar("session_id", default="bare") # session of the job running in this context
+
+class JobStatus:
+    """Stand-in for the st.status container of a job, recording what the job writes to it.
+
+    A background job cannot draw on the page, and the page is redrawn on every rerun, so element
+    calls such as `caption` or `code` are recorded and replayed by `draw`. `progress` returns the
+    status itself, so the progress bar is a single value that `empty` hides.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.elements = [] # (method, args, kwargs) in call order
+        self.progress_bar = None # (value, text), or None when hidden
+
+    def progress(self, value: float, text: str | None = None) -> "JobStatus":
+        with self.lock:
+            self.progress_bar = (value, text)
+        return self
+
+    def empty(self):
+        with self.lock:
+            self.progress_bar = None
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        def record(*args, **kwargs):
+            with self.lock:
+                self.elements.append((name, args, kwargs))
+        return record
+
+    def draw(self, container):
+        with self.lock:
+            elements = list(self.elements)
+            progress_bar = self.progress_bar
+        for name, args, kwargs in elements:
+            getattr(container, name)(*args, **kwargs)
+        if progress_bar is not None:
+            container.progress(*progress_bar)
+
+class Job:
+    """Handle to a job submitted to a JobManager, safe to keep across reruns."""
+    def __init__(self, session_id: str):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.status = JobStatus()
+        self.partial = None # (file name, mime type, data) of the latest partial result
+        self.partial_version = 0
+        self.started = time.time()
+        self.finished = None
+        self.future: Future | None = None
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def result(self) -> Any:
+        return self.future.result()
+
+    def exception(self) -> BaseException | None:
+        try:
+            return self.future.exception()
+        except CancelledError:
+            return None
+
+    def snapshot(self, file_name: str, mime: str, encode: Callable[[], bytes | str]) -> Callable[[], None]:
+        """Return a callback that stores `encode()` as the partial result `file_name` of the job.
+
+        The callback runs on the job loop, so the result is encoded between updates of the job.
+        """
+        def save():
+            self.partial = (file_name, mime, encode())
+            self.partial_version += 1
+        return save
+
+class JobManager:
+    """Runs jobs for all sessions on one event loop in a daemon thread.
+
+    Jobs outlive the script run that submitted them, so users can interact with the app and
+    navigate between pages while they run. Finished jobs are kept for `retention` seconds,
+    and at most `max_finished` of them, for their sessions to pick up the results.
+    """
+    def __init__(self, retention: float = JOB_RETENTION, max_finished: int = JOB_MAX_FINISHED):
+        self.logger = logging.getLogger(self.__class__.__qualname__) # shared by all sessions
+        self.retention = retention
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="job-loop", daemon=True)
+        self.thread.start()
+
+    def submit(self, session_id: str, work: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Start `work(job)` on the job loop and return the handle of the job."""
+        job = Job(session_id)
+        with self.lock:
+            self.jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, work), self.loop)
+        job.future.add_done_callback(lambda _: self._finish(job))
+        self._prune()
+        return job
+
+    async def _run(self, job: Job, work: Callable[[Job], Awaitable[Any]]) -> Any:
+        SESSION_ID.set(job.session_id) # copied into the tasks the job starts
+        self.logger.info("Started job %s of session %s", job.id[:8], job.session_id)
+        return await work(job)
+
+    def _finish(self, job: Job):
+        job.finished = time.time()
+        if job.cancelled():
+            self.logger.info("Cancelled job %s after %.1f s", job.id[:8], job.finished - job.started)
+        elif job.exception() is not None:
+            self.logger.error("Job %s failed after %.1f s: %s", job.id[:8], job.finished - job.started, job.exception())
+        else:
+            self.logger.info("Finished job %s in %.1f s", job.id[:8], job.finished - job.started)
+
+    def get(self, job_id: str) -> Job | None:
+        self._prune()
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _prune(self):
+        expiry = time.time() - self.retention
+        with self.lock:
+            finished = [job for job in self.jobs.values() if job.finished is not None]
+            excess = len(finished) - self.max_finished
+            for job in finished: # in submission order
+                if job.finished < expiry or excess > 0:
+                    del self.jobs[job.id]
+                    excess -= 1
+
+    def shutdown(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+            self.jobs.clear()
+        for job in jobs:
+            job.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Iterator
+from contextlib import contextmanager
+
+TRANSLATION_MEMORY_PATH = os.path.join(".cache", "translation_memory.sqlite3")
+TRANSLATION_MEMORY_MAX_BYTES = 256 * 2 ** 20
+TRANSLATION_JOURNAL_DIR = os.path.join(".cache", "journals")
+TRANSLATION_JOURNAL_TTL = 7 * 24 * 60 * 60 # seconds
+
+class TranslationMemory:
+    """SQLite store of past translations, keyed by backend, locales and normalized source text.
+
+    Source texts are NFC-normalized before hashing, so the same text typed with different
+    Unicode compositions shares an entry. Whitespace is kept, since it is part of the output.
+    When the stored texts exceed `max_bytes`, the least recently used entries are evicted.
+    """
+    LOOKUP_CHUNK = 500 # stays below SQLite's host parameter limit
+
+    def __init__(self, path: str = TRANSLATION_MEMORY_PATH, max_bytes: int = TRANSLATION_MEMORY_MAX_BYTES):
+        self.logger = logging.getLogger(self.__class__.__qualname__) # shared by all sessions
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS memory (
+                    backend TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    digest BLOB NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (backend, source_lang, target_lang, digest)
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS memory_last_used ON memory (last_used)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn: # commits, or rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return unicodedata.normalize("NFC", text)
+
+    @classmethod
+    def _digest(cls, text: str) -> bytes:
+        return hashlib.blake2b(cls.normalize(text).encode("utf-8"), digest_size=16).digest()
+
+    def lookup(self, backend: str, source_lang: str, target_lang: str, lang_dict: dict) -> dict:
+        """Return the remembered translations for the string values of `lang_dict`, by key."""
+        digests = {}
+        for key, value in lang_dict.items():
+            if isinstance(value, str):
+                digests.setdefault(self._digest(value), []).append(key)
+
+        found = {}
+        now = time.time()
+        with self._connect() as conn:
+            digest_list = list(digests)
+            for idx in range(0, len(digest_list), self.LOOKUP_CHUNK):
+                chunk = digest_list[idx:idx + self.LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT digest, target FROM memory WHERE backend = ? AND source_lang = ? AND target_lang = ? AND digest IN ({', '.join('?' * len(chunk))})",
+                    (backend, source_lang, target_lang, *chunk)
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE memory SET last_used = ? WHERE backend = ? AND source_lang = ? AND target_lang = ? AND digest = ?",
+                    [(now, backend, source_lang, target_lang, digest) for digest, _ in rows]
+                )
+                for digest, target in rows:
+                    for key in digests[digest]:
+                        found[key] = target
+
+        with self.lock:
+            self.hits += len(found)
+            self.misses += sum(len(keys) for keys in digests.values()) - len(found)
+        self.logger.info("Found %d of %d strings in translation memory", len(found), sum(len(keys) for keys in digests.values()))
+        return found
+
+    def store(self, backend: str, source_lang: str, target_lang: str, pairs: list[tuple[str, str]]):
+        """Remember (source, target) translation pairs, then evict old entries if over budget.
+
+        Pairs whose target is the source text are not remembered: a backend that failed quietly
+        returns the source, and remembering it would serve the untranslated text on every later run.
+        """
+        now = time.time()
+        rows = [
+            (backend, source_lang, target_lang, self._digest(source), source, target, len(source.encode("utf-8")) + len(target.encode("utf-8")), now)
+            for source, target in pairs
+            if isinstance(source, str) and isinstance(target, str) and self.normalize(target) != self.normalize(source)
+        ]
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total, count = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM memory").fetchone()
+        evicted = 0
+        while total > self.max_bytes and count:
+            batch = max(1, count // 10) # drop the oldest tenth per round instead of one row at a time
+            conn.execute("DELETE FROM memory WHERE rowid IN (SELECT rowid FROM memory ORDER BY last_used LIMIT ?)", (batch,))
+            evicted += batch
+            total, count = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM memory").fetchone()
+        if evicted:
+            self.logger.info("Evicted %d entries from translation memory", evicted)
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            total, count = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM memory").fetchone()
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+class TranslationJournal:
+    """Append-only JSON Lines log of the finished batches of one translation job.
+
+    Jobs are identified by a digest of their backend, locales and source strings, so running the
+    same job again, e.g. after the session reconnected, replays finished batches instead of
+    requesting them. Journals untouched for TRANSLATION_JOURNAL_TTL are removed.
+    """
+    def __init__(self, job_id: str, directory: str = TRANSLATION_JOURNAL_DIR):
+        self.logger = logging.getLogger(self.__class__.__qualname__)
+        self.path = os.path.join(directory, f"{job_id}.jsonl")
+        os.makedirs(directory, exist_ok=True)
+        self._prune(directory)
+
+    @staticmethod
+    def digest(*parts) -> str:
+        return hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _prune(self, directory: str):
+        expiry = time.time() - TRANSLATION_JOURNAL_TTL
+        for entry in os.scandir(directory):
+            try:
+                if entry.path != self.path and entry.stat().st_mtime < expiry:
+                    os.remove(entry.path)
+            except OSError:
+                pass # removed by another session
+
+    def load(self) -> dict[str, dict]:
+        """Return the outputs of finished batches by batch id."""
+        finished = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError: # last line cut short by a crash
+                        continue
+                    finished[record["batch"]] = record["out"]
+        except FileNotFoundError:
+            pass
+        if finished:
+            self.logger.info("Loaded %d finished batches from %s", len(finished), self.path)
+        return finished
+
+    def append(self, batch_id: str, out: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"batch": batch_id, "out": out}, ensure_ascii=False) + "\n")
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
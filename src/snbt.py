@@ -0,0 +1,36 @@
+# SNBT tasks for the process pools of FTBQuestConverter. Worker processes import this module
+# to run them, so it must not import streamlit or anything else heavy.
+import pickle
+import multiprocessing
+import ftb_snbt_lib as slib
+
+from io import BytesIO
+from multiprocessing.context import BaseContext
+from ftb_snbt_lib import tag
+
+class TagPickler(pickle.Pickler):
+    """Pickler for ftb_snbt_lib tags, whose List[...] classes are created on the fly and cannot be pickled by reference."""
+    def reducer_override(self, obj):
+        if isinstance(obj, type) and issubclass(obj, tag.List) and obj.subtype is not None:
+            return tag.List.__class_getitem__, (obj.subtype,)
+        if isinstance(obj, tag.Array):
+            return type(obj), (obj.array_prefix, list(obj))
+        return NotImplemented
+
+def pickle_tag(quest_data: tag.Base) -> bytes:
+    buffer = BytesIO()
+    TagPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(quest_data)
+    return buffer.getvalue()
+
+def loads_snbt(quest_data: str) -> bytes:
+    """Parse SNBT in a worker process and return the pickled tag tree."""
+    return pickle_tag(slib.loads(quest_data))
+
+def dumps_snbt(quest_data: bytes) -> str:
+    """Serialize a pickled tag tree to SNBT in a worker process."""
+    return slib.dumps(pickle.loads(quest_data))
+
+def pool_context() -> BaseContext:
+    """Start method for worker processes that is safe to use from any thread of the server."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
@@ -1,202 +1,821 @@
 import re
+import sys
 import json
+import time
+import atexit
+import hashlib
+import weakref
+import threading
 import asyncio
 import logging
 from abc import abstractmethod
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Callable, NamedTuple
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import wait as wait_futures
+from collections import OrderedDict
 from flatten_json import flatten, unflatten_list
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential, RetryCallState
 from json_repair import repair_json
 
-import googletrans
-import deepl
-import tiktoken
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableLambda
-from langchain_core.messages import AIMessage
-from langchain_core.callbacks.base import BaseCallbackHandler
-from langchain_google_genai import ChatGoogleGenerativeAI
-
 from src.utils import get_session_id
 from src.constants import MINECRAFT_TO_DEEPL, MINECRAFT_TO_GOOGLE
+from src.memory import TranslationMemory, TranslationJournal
+
+if TYPE_CHECKING: # backend SDKs are imported when a backend is first used
+    import googletrans
+    import tiktoken
+
+_PROTECTED_SPAN = (
+    r"\\n" # newline
+    r"|&[0-9a-z]|§[0-9a-z]" # color and formatting codes
+    r"|\{[^{}]*\}" # {@pagebreak}, {image:...} and template placeholders
+    r"|\[[^\[\]]*\]" # inline text components
+    r"|%(?:\d+\$)?[-+#0]*\d*(?:\.\d+)?(?:[sdfc](?!\w)|%)" # printf-style formats, not "10% speed" or "5%damage"
+    r"|<\s*\d+\s*>" # text that looks like a sentinel
+)
+PROTECTED_PATTERN = re.compile(f"((?:{_PROTECTED_SPAN})(?:{_PROTECTED_SPAN})*)") # one leading span lets re skip ahead by its first character
+SENTINEL_PATTERN = re.compile(r"(<\s*\d+\s*>|&(?![0-9a-z]))")
+SENTINELS = [f"<{idx}>" for idx in range(256)]
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+REFERENCE_PATTERN = re.compile(r"[a-z0-9_.-]+:[a-z0-9_./-]+") # resource locations such as minecraft:diamond
+BRACED_PATTERN = re.compile(r"\{[^{}]*\}") # a single {...}, not a template like {0} Diamond for {1}
+
+class StatusError(Exception):
+    """Unexpected HTTP status from a backend SDK that reports it only in its message."""
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for calls to one backend.
+
+    The limit grows by `increase` per window of successful calls, and is multiplied by `decrease`
+    when a call is rate limited or takes over `latency_factor` times the usual latency of calls
+    its size. Usual latencies are moving averages per batch size bucket, so they follow the
+    backend and a small batch is never compared with a large one. Only calls started after the
+    last cut can cut again, so one burst of 429s counts once.
+    """
+    def __init__(self, initial: int = 4, floor: int = 1, ceiling: int = 16, increase: float = 1.0, decrease: float = 0.5, latency_factor: float = 3.0, smoothing: float = 0.2):
+        self.limit = float(initial)
+        self.floor = floor
+        self.ceiling = ceiling
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing # weight of the latest call in the moving averages
+        self.latencies = {} # moving average of the call latency per size bucket
+        self.last_cut = float("-inf")
+        self.in_flight = weakref.WeakKeyDictionary() # [condition, count] per event loop
+
+    @staticmethod
+    def _status_code(exc: BaseException) -> int | None:
+        response = getattr(exc, "response", None)
+        for status_code in (getattr(exc, "status_code", None), getattr(exc, "http_status_code", None), getattr(exc, "code", None), getattr(response, "status_code", None)):
+            if isinstance(status_code, int):
+                return status_code
+        return None
+
+    @classmethod
+    def is_rate_limited(cls, exc: BaseException) -> bool:
+        deepl = sys.modules.get("deepl") # loaded only if DeepL was used
+        if deepl is not None and isinstance(exc, deepl.TooManyRequestsException):
+            return True
+        return cls._status_code(exc) == 429 or "RESOURCE_EXHAUSTED" in str(exc) or "Too Many Requests" in str(exc)
+
+    @classmethod
+    def is_transient(cls, exc: BaseException) -> bool:
+        """Whether the same call may succeed later: rate limits, timeouts, connection and server errors."""
+        if cls.is_rate_limited(exc) or isinstance(exc, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+            return True
+        status_code = cls._status_code(exc)
+        if status_code is not None and status_code >= 500:
+            return True
+        httpx = sys.modules.get("httpx")
+        deepl = sys.modules.get("deepl")
+        return (httpx is not None and isinstance(exc, httpx.TransportError)) or (deepl is not None and isinstance(exc, deepl.ConnectionException))
+
+    def _cut(self, started: float):
+        if started < self.last_cut: # already cut for this window
+            return
+        self.limit = max(self.floor, self.limit * self.decrease)
+        self.last_cut = time.monotonic()
+
+    @staticmethod
+    def _bucket(size: int) -> int:
+        return max(size, 1).bit_length() # sizes within a factor of two share a bucket
+
+    def on_success(self, started: float, size: int = 1):
+        latency = time.monotonic() - started
+        bucket = self._bucket(size)
+        usual = self.latencies.get(bucket)
+        self.latencies[bucket] = latency if usual is None else usual + self.smoothing * (latency - usual)
+        if usual is not None and latency > usual * self.latency_factor: # backend is slowing down
+            self._cut(started)
+        else:
+            self.limit = min(self.ceiling, self.limit + self.increase / self.limit)
+
+    def on_error(self, exc: BaseException, started: float):
+        if self.is_rate_limited(exc):
+            self._cut(started)
+
+    @asynccontextmanager
+    async def slot(self, size: int = 1):
+        loop = asyncio.get_running_loop()
+        state = self.in_flight.get(loop)
+        if state is None: # conditions are bound to the loop they are used on
+            state = self.in_flight[loop] = [asyncio.Condition(), 0]
+        condition = state[0]
+        async with condition:
+            await condition.wait_for(lambda: state[1] < int(self.limit))
+            state[1] += 1
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.on_error(e, started)
+            raise
+        else:
+            self.on_success(started, size)
+        finally:
+            async with condition:
+                state[1] -= 1
+                condition.notify_all()
+
+class BatchLimits(NamedTuple):
+    """Per-request limits of a backend. None means unlimited."""
+    tokens: int | None = None
+    chars: int | None = None
+    items: int | None = None
+    bytes: int | None = None
+
+def _related_key(key: str) -> str:
+    """Keys of the same quest or list share everything up to the last segment."""
+    return key.split("|", 1)[0].rpartition(".")[0] or key
+
+class ByteEstimator:
+    """Offline token estimate from the UTF-8 size of a key/value pair, calibrated per backend."""
+    def __init__(self, bytes_per_token: float, overhead: int = 8):
+        self.bytes_per_token = bytes_per_token
+        self.overhead = overhead # quotes, colon, braces of the JSON pair
+
+    def count(self, keys: list[str], values: list) -> list[int]:
+        return [
+            int((len(key) + len((value if isinstance(value, str) else str(value)).encode("utf-8")) + self.overhead) / self.bytes_per_token) + 1
+            for key, value in zip(keys, values)
+        ]
+
+DEFAULT_ESTIMATOR = ByteEstimator(bytes_per_token=3.0) # English runs ~4 bytes per GPT-4 token, leave headroom for other scripts
+
+_ENCODER = None
+
+def get_encoder() -> "tiktoken.Encoding":
+    """Load the GPT-4 encoding once per process; this reads or downloads its BPE file."""
+    global _ENCODER
+    if _ENCODER is None:
+        import tiktoken
+        _ENCODER = tiktoken.encoding_for_model("gpt-4")
+    return _ENCODER
+
+class TiktokenEstimator:
+    """Exact GPT-4 token counts of JSON pairs, encoded in batches and memoized across calls."""
+    MAX_ENTRIES = 200_000
+    counts = {} # shared by all instances
+
+    def count(self, keys: list[str], values: list) -> list[int]:
+        pairs = [json.dumps({key: value}, ensure_ascii=False) for key, value in zip(keys, values)]
+        result = [self.counts.get(pair) for pair in pairs]
+        missing = list(dict.fromkeys(pair for pair, count in zip(pairs, result) if count is None))
+        if missing:
+            new = dict(zip(missing, map(len, get_encoder().encode_batch(missing))))
+            if len(self.counts) + len(new) > self.MAX_ENTRIES:
+                self.counts.clear()
+            self.counts.update(new)
+            result = [new[pair] if count is None else count for pair, count in zip(pairs, result)]
+        return result
+
+def plan_batches(lang_dict: dict, limits: BatchLimits, estimator: ByteEstimator | TiktokenEstimator = DEFAULT_ESTIMATOR) -> list[dict]:
+    """Pack pairs into as few requests as the limits allow, best-fit-decreasing.
+
+    Keys of the same quest or list are packed as one unit when they fit in a single request.
+    Each batch keeps the original key order, and batches are ordered by their first key.
+    A pair exceeding the limits on its own gets a batch of its own.
+    """
+    if not lang_dict:
+        return []
+    if limits == BatchLimits():
+        return [dict(lang_dict)]
+    keys, values = list(lang_dict), list(lang_dict.values())
+    texts = [value if isinstance(value, str) else json.dumps(value, ensure_ascii=False) for value in values]
+    columns = []
+    if limits.tokens is not None:
+        columns.append(estimator.count(keys, values))
+    if limits.chars is not None:
+        columns.append(list(map(len, texts)))
+    if limits.items is not None:
+        columns.append([1] * len(keys))
+    if limits.bytes is not None:
+        columns.append([len(text.encode("utf-8")) for text in texts])
+    caps = tuple(cap for cap in limits if cap is not None)
+    sizes = dict(zip(keys, zip(*columns)))
+    order = {key: idx for idx, key in enumerate(keys)}
+
+    groups = {}
+    for key in keys:
+        groups.setdefault(_related_key(key), []).append(key)
+    units = []
+    for members in groups.values():
+        total = tuple(map(sum, zip(*(sizes[key] for key in members))))
+        if all(size <= cap for size, cap in zip(total, caps)):
+            units.append((total, members))
+        else: # too large for one request, pack its pairs separately
+            units.extend((sizes[key], [key]) for key in members)
+    units.sort(key=lambda unit: max((size / cap for size, cap in zip(unit[0], caps)), default=0), reverse=True)
+
+    # bins are looked up by their room in the most constrained dimension
+    primary = max(range(len(caps)), key=lambda dim: sum(columns[dim]) / caps[dim])
+    smallest = tuple(map(min, columns))
+    bins = [] # [room left, keys]
+    rooms = [] # sorted (primary room, bin index) of bins with room for at least the smallest pair
+
+    def place(room: tuple, idx: int):
+        if all(left >= small for left, small in zip(room, smallest)):
+            insort(rooms, (room[primary], idx))
+
+    def best_fit(size: tuple, members: list) -> bool:
+        for pos in range(bisect_left(rooms, (size[primary],)), len(rooms)):
+            idx = rooms[pos][1]
+            room = bins[idx][0]
+            if all(extra <= left for extra, left in zip(size, room)):
+                del rooms[pos]
+                bins[idx][0] = room = tuple(left - extra for left, extra in zip(room, size))
+                bins[idx][1].extend(members)
+                place(room, idx)
+                return True
+        return False
+
+    for size, members in units:
+        if best_fit(size, members):
+            continue
+        if len(members) > 1: # split the unit over open requests before starting a new one
+            members = [key for key in members if not best_fit(sizes[key], [key])]
+            if not members:
+                continue
+            size = tuple(map(sum, zip(*(sizes[key] for key in members))))
+        room = tuple(cap - extra for cap, extra in zip(caps, size))
+        bins.append([room, list(members)])
+        place(room, len(bins) - 1)
+
+    batches = [{key: lang_dict[key] for key in sorted(members, key=order.__getitem__)} for _, members in bins]
+    batches.sort(key=lambda batch: order[next(iter(batch))])
+    return batches
+
+class BisectStats:
+    """Record of the failed batches bisected during one translate call."""
+    def __init__(self):
+        self.splits = 0
+        self.isolated = [] # keys that failed on their own
+        self.wasted_tokens = 0 # estimated tokens sent in failed requests
+
+def _on_retry(retry_state: RetryCallState):
+    """tenacity hook to report rate limits hit between retries of Translator._translate."""
+    translator = retry_state.args[0]
+    translator.limiter.on_error(retry_state.outcome.exception(), retry_state.start_time)
 
 class Translator:
-    def __init__(self):        
-        self.logger = logging.getLogger(f"{self.__class__.__qualname__} ({get_session_id()})")
+    CONCURRENCY = {"initial": 4, "floor": 1, "ceiling": 16}
+    BATCH_LIMITS = BatchLimits(tokens=6000)
+    PARTIAL_INTERVAL = 5 # seconds between partial result updates
+    SIZE_ESTIMATOR = DEFAULT_ESTIMATOR
+
+    NUMBER_PATTERN = re.compile(r"(?<![&\w])\d+(?:[.,]\d+)*(?!\w)") # standalone numbers, not color codes
+    PLACEHOLDER_PATTERN = re.compile(r"\{(\d+)\}")
+
+    def __init__(self, memory: TranslationMemory | None = None):
+        self.memory = memory
+        self.limiter = AdaptiveLimiter(**self.CONCURRENCY)
+        self.users = 0 # running translate calls
+        self.retired = False
+        self.usage_lock = threading.Lock()
         self.logger.info("Initialized")
+    
+    @property
+    def logger(self) -> logging.Logger:
+        return logging.getLogger(f"{self.__class__.__qualname__} ({get_session_id()})") # instances are shared by sessions
+
+    @property
+    def backend(self) -> str:
+        return self.__class__.__qualname__
+
+    async def aclose(self):
+        """Close the connections opened on the running event loop."""
+
+    def close(self):
+        """Close the connections of every event loop, each on the loop that owns it."""
+
+    def _close_loops(self, loops: weakref.WeakKeyDictionary, timeout: float = 5):
+        """Run aclose on each loop in `loops`, waiting for it unless the loop runs in this thread."""
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop in list(loops):
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(self.aclose(), loop)
+                if loop is not current: # waiting on our own loop would deadlock
+                    wait_futures([future], timeout)
+            else:
+                loop.run_until_complete(self.aclose())
+
+    @contextmanager
+    def in_use(self):
+        """Mark a running translation, so that a retired translator closes only once it is idle."""
+        with self.usage_lock:
+            self.users += 1
+        try:
+            yield
+        finally:
+            with self.usage_lock:
+                self.users -= 1
+                idle = self.retired and not self.users
+            if idle:
+                self.close()
+
+    def retire(self):
+        """Close the translator now if idle, otherwise when its last translation finishes."""
+        with self.usage_lock:
+            self.retired = True
+            idle = not self.users
+        if idle:
+            self.close()
 
     @staticmethod
-    def _escape(text: str) -> str:
-        text = re.sub(r"(\\n)", r"<br>", text) # escape newline
-        return re.sub(r"(&[0-9a-z])", lambda x: f"<{x.group(0)[1:]}>", text) # escape color code
-    
+    def protect(text: str) -> tuple[str, list[str]]:
+        """Swap each run of protected spans for a <n> sentinel, returning the text and its spans."""
+        parts = PROTECTED_PATTERN.split(text) # text, span, text, span, ..., text
+        if len(parts) == 1:
+            return text, []
+        spans = parts[1::2]
+        parts[1::2] = SENTINELS[:len(spans)] if len(spans) <= len(SENTINELS) else [f"<{idx}>" for idx in range(len(spans))]
+        return "".join(parts), spans
+
     @staticmethod
-    def _unescape(text: str) -> str:
-        text = re.sub(r"(<[0-9a-zA-Z]>)", lambda x: f"&{x.group(0)[1:-1].lower()}", text) # restore color code
-        text = re.sub(r"&(?=[^0-9a-z]|$)", r"\&", text) # escape single &
-        text = re.sub(r"(<br>|<BR>)", r"\\n", text) # restore newline
-        return text
-
-    def make_batches(self, lang_dict: dict, max_tokens: int) -> list:
-        batches = []
-        current_batch = {}
-        current_tokens = 0
-        enc = tiktoken.encoding_for_model("gpt-4")
-        
+    def restore(text: str, spans: list[str]) -> str:
+        """Put the spans of `protect` back in place of their sentinels, escaping lone & on the way."""
+        parts = SENTINEL_PATTERN.split(text) # text, sentinel or &, text, ...
+        if len(parts) == 1:
+            return text
+        for pos in range(1, len(parts), 2):
+            part = parts[pos]
+            if part == "&":
+                parts[pos] = "\\&" # escape single &
+            else:
+                idx = int(part.strip("<> \t\n"))
+                if idx < len(spans):
+                    parts[pos] = spans[idx]
+        return "".join(parts)
+
+    @classmethod
+    def is_translatable(cls, value) -> bool:
+        """Whether a value has text for the backend, rather than only formatting, numbers or references."""
+        if not isinstance(value, str):
+            return False
+        if value.startswith("[") and value.endswith("]"): # text component
+            return False
+        if BRACED_PATTERN.fullmatch(value): # {@pagebreak}, {image:...}
+            return False
+        if REFERENCE_PATTERN.fullmatch(value):
+            return False
+        return LETTER_PATTERN.search(cls.protect(value)[0]) is not None # sentinels hold no letters
+
+    @staticmethod
+    def deduplicate(lang_dict: dict) -> tuple[dict, dict]:
+        """Collapse identical string values into one translation unit.
+
+        Returns the unique units, keyed by the first key holding each value, and a mapping
+        from those keys to the other keys sharing the value.
+        """
+        unique = {}
+        first_keys = {}
+        copies = {}
         for key, value in lang_dict.items():
-            pair_str = json.dumps({key: value}, ensure_ascii=False)
-            tokens = len(enc.encode(pair_str)) # count tokens
-            if current_tokens + tokens > max_tokens and current_batch:
-                batches.append(current_batch) # append current batch
-                current_batch = {}
-                current_tokens = 0
-
-            current_batch[key] = value # add to current batch if not exceeding max tokens
-            current_tokens += tokens
-        
-        if current_batch: # append the last batch
-            batches.append(current_batch)
+            if not isinstance(value, str):
+                unique[key] = value
+                continue
+            first = first_keys.setdefault(value, key)
+            if first == key:
+                unique[key] = value
+            else:
+                copies.setdefault(first, []).append(key)
+        return unique, copies
 
-        self.logger.info("Created %d batches", len(batches))
+    @classmethod
+    def templatize(cls, lang_dict: dict) -> tuple[dict, dict]:
+        """Translate strings that differ only by numbers as one template.
+
+        Numbers are replaced by {0}, {1}, ... placeholders. Templates shared by two or more
+        strings are sent once, keyed by the first of them; the rest of the strings are kept.
+        Returns the units to translate and, for each template key, the (key, numbers) pairs to fill.
+        """
+        groups = {}
+        for key, value in lang_dict.items():
+            if not isinstance(value, str) or "{" in value or "}" in value: # keep existing braces unambiguous
+                continue
+            numbers = cls.NUMBER_PATTERN.findall(value)
+            if numbers:
+                counter = iter(range(len(numbers)))
+                template = cls.NUMBER_PATTERN.sub(lambda _: f"{{{next(counter)}}}", value)
+                groups.setdefault(template, []).append((key, numbers))
+
+        templates = {}
+        instances = {}
+        for template, members in groups.items():
+            if len(members) > 1:
+                templates[members[0][0]] = template
+                instances[members[0][0]] = members
+        grouped = {key for members in instances.values() for key, _ in members}
+
+        units = {}
+        for key, value in lang_dict.items():
+            if key in templates:
+                units[key] = templates[key]
+            elif key not in grouped:
+                units[key] = value
+        return units, instances
+
+    @classmethod
+    def fill(cls, template: str, numbers: list) -> str | None:
+        """Substitute numbers back into a translated template, or return None if placeholders were lost."""
+        placeholders = sorted(int(idx) for idx in cls.PLACEHOLDER_PATTERN.findall(template))
+        if placeholders != list(range(len(numbers))):
+            return None
+        return cls.PLACEHOLDER_PATTERN.sub(lambda x: numbers[int(x.group(1))], template)
 
+    def count_tokens(self, lang_dict: dict) -> int:
+        return sum(self.SIZE_ESTIMATOR.count(list(lang_dict), list(lang_dict.values())))
+
+    def count_requests(self, lang_dict: dict) -> int:
+        return len(plan_batches(lang_dict, self.BATCH_LIMITS, self.SIZE_ESTIMATOR))
+
+    def make_batches(self, lang_dict: dict) -> list:
+        batches = plan_batches(lang_dict, self.BATCH_LIMITS, self.SIZE_ESTIMATOR)
+        self.logger.info("Created %d batches", len(batches))
         return batches
     
-    async def translate(self, source_lang_dict: dict, target_lang_dict: dict, target_lang: str, status):
-        semaphore = asyncio.Semaphore(4) # limit concurrent translations
-        progress_bar = status.progress(0, "Translating...")
+    async def translate(self, source_lang_dict: dict, target_lang_dict: dict, target_lang: str, status, source_lang: str = "auto", on_partial: Callable[[], None] | None = None) -> BisectStats:
+        """Translate `source_lang_dict` into `target_lang_dict`, one top-level key at a time.
+
+        Batches are merged in completion order, so `target_lang_dict` holds every fully translated
+        key as soon as its last string arrives, and `on_partial` is called at most every
+        PARTIAL_INTERVAL seconds to show it. New keys are put in source order before each call and
+        at the end. Finished batches are journaled for resuming the job.
+        Returns the failed batches bisected by this call; the translator is shared by sessions.
+        """
+        with self.in_use(): # keeps the factory from closing it mid-translation
+            progress_bar = status.progress(0, "Translating...")
         
-        async def wrap_translate(idx, total, batch):
-            async with semaphore:
-                await asyncio.sleep(5) # 5 sec delay
+            stats = BisectStats()
+            async def wrap_translate(batch_id, batch):
+                return batch_id, await bisect_translate(batch_id, batch)
 
+            async def bisect_translate(batch_id, batch):
+                """Translate a batch, splitting it in half on failure until the failing strings are isolated."""
                 try:
-                    progress_bar.progress(idx / total, f"Translating... ({idx}/{total})")
-                    self.logger.info("Translating batch (%d/%d)", idx, total)
-                    return await self._translate(batch, target_lang)
-                except Exception:
-                    self.logger.error("Failed to translate batch (%d/%d)", idx, total, exc_info=True)
-                    return {} # return empty dict on failure
-
-        source_lang_dict_flatten = flatten(source_lang_dict, separator="|") # Flatten json
-        batches = self.make_batches(source_lang_dict_flatten, max_tokens=6000) # 6000 tokens max
+                    async with self.limiter.slot(len(batch)): # adapts concurrency to the backend
+                        self.logger.info("Translating batch %s (%d strings, concurrency %d)", batch_id[:8], len(batch), int(self.limiter.limit))
+                        return await self._translate(batch, target_lang)
+                except Exception as e:
+                    self.logger.error("Failed to translate batch %s", batch_id[:8], exc_info=True)
+                    stats.wasted_tokens += self.count_tokens(batch)
+                    if AdaptiveLimiter.is_rate_limited(e): # splitting would not help, leave it to a resumed run
+                        return {}
+                    if len(batch) == 1:
+                        stats.isolated.extend(batch)
+                        return {} # return empty dict on failure
+                    stats.splits += 1
+                    items = list(batch.items())
+                    halves = dict(items[:len(items) // 2]), dict(items[len(items) // 2:])
+                    outs = await asyncio.gather(*(bisect_translate(f"{batch_id}/{idx}", half) for idx, half in enumerate(halves)))
+                    return {**outs[0], **outs[1]}
+
+            members = {} # flattened keys of each top-level key
+            owners = {} # top-level key of each flattened key
+            source_lang_dict_flatten = {}
+            for top_key, value in source_lang_dict.items():
+                flat = flatten({top_key: value}, separator="|") # Flatten json
+                members[top_key] = list(flat)
+                owners.update(dict.fromkeys(flat, top_key))
+                source_lang_dict_flatten.update(flat)
+            missing = {top_key: set(keys) for top_key, keys in members.items()}
+            # SQLite and journal I/O runs in worker threads, off the event loop shared with other jobs
+            journal = await asyncio.to_thread(TranslationJournal, TranslationJournal.digest(self.backend, source_lang, target_lang, source_lang_dict_flatten))
+            result = {}
+            last_partial = time.monotonic()
+            existing = set(target_lang_dict) # keep their place, as assigning to them would
+
+            def reorder():
+                """Put the keys added by this translation in source order, after the existing ones."""
+                added = [key for key in source_lang_dict if key in target_lang_dict and key not in existing]
+                kept = {key: value for key, value in target_lang_dict.items() if key in existing}
+                kept.update((key, target_lang_dict[key]) for key in added)
+                target_lang_dict.clear()
+                target_lang_dict.update(kept)
+
+            def merge(out: dict):
+                """Record translated strings and update every top-level key they complete."""
+                nonlocal last_partial
+                for key, value in out.items():
+                    top_key = owners.get(key)
+                    if top_key not in missing or value is None: # unknown, already complete or failed
+                        continue
+                    result[key] = value
+                    missing[top_key].discard(key)
+                    if not missing[top_key]:
+                        del missing[top_key]
+                        target_lang_dict[top_key] = unflatten_list({key: result[key] for key in members[top_key]}, separator="|")[top_key] # Unflatten json
+                if on_partial is not None and time.monotonic() - last_partial >= self.PARTIAL_INTERVAL:
+                    reorder() # batches finish in any order
+                    on_partial()
+                    last_partial = time.monotonic()
+        
+            remembered = {}
+            if self.memory is not None: # skip strings translated before
+                remembered = await asyncio.to_thread(self.memory.lookup, self.backend, source_lang, target_lang, source_lang_dict_flatten)
+                source_lang_dict_flatten = {key: value for key, value in source_lang_dict_flatten.items() if key not in remembered}
+                status.caption(f"Translation memory: {len(remembered)} hits, {len(source_lang_dict_flatten)} misses")
+                merge(remembered)
         
-        tasks = [wrap_translate(idx, len(batches), batch) for idx, batch in enumerate(batches, start=1)]
-        batches_out = await asyncio.gather(*tasks)
+            unique, copies = self.deduplicate(source_lang_dict_flatten) # translate repeated strings once
+            if copies:
+                duplicates = {key: source_lang_dict_flatten[key] for keys in copies.values() for key in keys}
+                saved_tokens = self.count_tokens(duplicates)
+                saved_requests = await asyncio.to_thread(lambda: self.count_requests(source_lang_dict_flatten) - self.count_requests(unique)) # batches planned without and with deduplication
+                self.logger.info("Deduplicated %d of %d strings, saving %d requests and %d tokens", len(duplicates), len(source_lang_dict_flatten), saved_requests, saved_tokens)
+                status.caption(f"Deduplication: {len(duplicates)} repeated strings skipped ({saved_requests} requests, ~{saved_tokens} tokens)")
         
-        progress_bar.empty()
-        self.logger.info("Translated %d batches", len(batches_out))
+            untranslatable = {key: value for key, value in unique.items() if not self.is_translatable(value)} # keep as is
+            if untranslatable:
+                skipped_chars = sum(len(value) for value in untranslatable.values() if isinstance(value, str))
+                self.logger.info("Skipped %d untranslatable strings (%d chars)", len(untranslatable), skipped_chars)
+                status.caption(f"Prefilter: {len(untranslatable)} untranslatable strings skipped ({skipped_chars} chars)")
+            translatable = {key: value for key, value in unique.items() if key not in untranslatable}
+        
+            units, instances = self.templatize(translatable) # translate strings differing only by numbers once
+            if instances:
+                self.logger.info("Templated %d strings into %d units (ratio %.2f)", len(translatable), len(units), len(units) / len(translatable))
+                status.caption(f"Templating: {len(translatable)} strings reduced to {len(units)} ({len(units) / len(translatable):.0%})")
+        
+            failed = 0
+            async def translate_batches(lang_dict: dict):
+                """Yield batch outputs in completion order, replaying batches finished by an earlier run."""
+                nonlocal failed
+                finished = await asyncio.to_thread(journal.load)
+                tasks = []
+                for batch in self.make_batches(lang_dict):
+                    batch_id = journal.digest(batch)
+                    if batch_id in finished:
+                        yield finished[batch_id]
+                        batch = {key: value for key, value in batch.items() if key not in finished[batch_id]} # strings that failed last time
+                        batch_id = journal.digest(batch)
+                    if batch and batch_id not in finished:
+                        tasks.append(wrap_translate(batch_id, batch))
+                futures = [asyncio.ensure_future(task) for task in tasks]
+                try:
+                    for done, future in enumerate(asyncio.as_completed(futures), start=1):
+                        batch_id, out = await future
+                        progress_bar.progress(done / len(tasks), f"Translating... ({done}/{len(tasks)})")
+                        if out:
+                            await asyncio.to_thread(journal.append, batch_id, out)
+                        else:
+                            failed += 1
+                        yield out
+                finally: # stop the remaining batches when the job is cancelled
+                    for future in futures:
+                        future.cancel()
+                self.logger.info("Translated %d batches", len(tasks))
 
-        result = {}
-        for out in batches_out:
-            result.update(out)
-        result = unflatten_list(result, separator="|") # Unflatten json
-        self.logger.info("Gathered translated results")
-
-        error_log = []
-        for key in source_lang_dict.keys():
-            if result.get(key) is None: # Missing key
-                error_log.append(f"Missing translation: {key}")
-                continue
-            if isinstance(source_lang_dict[key], list): # Invalid list length
-                if not isinstance(result[key], list) or len(source_lang_dict[key]) != len(result[key]):
-                    error_log.append(f"Invalid translation: {key}")
-                    continue
-            target_lang_dict[key] = result[key] # Update target_lang_dict only for valid keys
-        self.logger.info("Updated target language dictionary")
+            async def collect(out: dict, remember: bool = True):
+                """Store and merge concrete translations, fanning them out to repeated strings."""
+                out = {key: value for key, value in out.items() if key in unique and value is not None}
+                if self.memory is not None and remember: # only successful results reach the memory
+                    await asyncio.to_thread(self.memory.store, self.backend, source_lang, target_lang, [(unique[key], value) for key, value in out.items()])
+                for key in out.keys() & copies.keys():
+                    out.update(dict.fromkeys(copies[key], out[key]))
+                merge(out)
+        
+            await collect(untranslatable, remember=False)
+            retry = {}
+            async for out in translate_batches(units):
+                concrete = {}
+                for key, value in out.items():
+                    if key not in instances:
+                        concrete[key] = value
+                        continue
+                    for member_key, numbers in instances[key]:
+                        filled = self.fill(value, numbers) if isinstance(value, str) else None
+                        if filled is None: # placeholders were altered, translate as is
+                            retry[member_key] = unique[member_key]
+                        else:
+                            concrete[member_key] = filled
+                await collect(concrete)
+            if retry:
+                self.logger.warning("Retrying %d strings with broken placeholders", len(retry))
+                async for out in translate_batches(retry):
+                    await collect(out)
         
-        if error_log:
-            status.write('**Error Log**')
-            status.code('\n'.join(error_log), language=None, line_numbers=True, height=300)
+            reorder()
+            progress_bar.empty()
+            self.logger.info("Updated target language dictionary")
+            if stats.splits:
+                self.logger.warning("Split failed batches %d times, isolated %d failing strings, wasted ~%d tokens", stats.splits, len(stats.isolated), stats.wasted_tokens)
+                status.caption(f"Retried failed batches in {stats.splits} splits: {len(stats.isolated)} strings failed (~{stats.wasted_tokens} tokens wasted)")
+
+            if not failed and not missing:
+                await asyncio.to_thread(journal.discard)
+            error_log = [f"Missing translation: {key}" for key in missing]
+            if error_log:
+                status.write('**Error Log**')
+                status.code('\n'.join(error_log), language=None, line_numbers=True, height=300)
+            return stats
 
     @abstractmethod
     async def _translate(self, batch: str, target_lang: str) -> dict:
         pass
 
 class GoogleTranslator(Translator):
-    def __init__(self):
-        self.translator = googletrans.Translator()
-        super().__init__()
+    STATUS_PATTERN = re.compile(r'Unexpected status code "(\d+)"') # googletrans raises a bare Exception
+    CONCURRENCY = {"initial": 4, "floor": 1, "ceiling": 8}
+    BATCH_LIMITS = BatchLimits(items=20) # googletrans sends one request per string, so batches only set progress and journal granularity
+    MAX_CHARS = 5000 # per string, the most one request of the web endpoint takes
+
+    def __init__(self, memory: TranslationMemory | None = None):
+        self.clients = weakref.WeakKeyDictionary() # httpx pools are bound to an event loop
+        super().__init__(memory)
+
+    @property
+    def translator(self) -> "googletrans.Translator":
+        loop = asyncio.get_running_loop()
+        client = self.clients.get(loop)
+        if client is None:
+            import googletrans
+            client = self.clients[loop] = googletrans.Translator(raise_exception=True) # by default, failures return the source text
+        return client
+
+    async def aclose(self):
+        client = self.clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.client.aclose()
+
+    def close(self):
+        self._close_loops(self.clients)
     
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(min=4, max=64), reraise=True)
+    @classmethod
+    def split_text(cls, text: str) -> tuple[list[str], list[str]]:
+        """Cut text longer than MAX_CHARS into pieces, at spaces where possible and never inside a sentinel.
+
+        Returns the pieces and the separators to join their translations with.
+        """
+        pieces = []
+        separators = []
+        while len(text) > cls.MAX_CHARS:
+            cut = text.rfind(" ", 1, cls.MAX_CHARS + 1)
+            if cut != -1:
+                pieces.append(text[:cut])
+                separators.append(" ")
+                text = text[cut + 1:]
+                continue
+            cut = cls.MAX_CHARS
+            opening = text.rfind("<", 1, cut)
+            if opening > text.rfind(">", 0, cut): # keep <n> whole
+                cut = opening
+            pieces.append(text[:cut])
+            separators.append("")
+            text = text[cut:]
+        pieces.append(text)
+        return pieces, separators
+
+    @retry(retry=retry_if_exception(AdaptiveLimiter.is_transient), stop=stop_after_attempt(5), wait=wait_exponential(min=4, max=64), before_sleep=_on_retry, reraise=True)
     async def _translate(self, batch: dict, target_lang: str) -> dict:
         batch_input_keys = [] # keys to translate
         batch_input_values = [] # values to translate
         batch_original = {} # formatted text - do not translate
         batch_translated = {} # translated text
+        batch_spans = [] # protected spans of each value
 
         for key, value in batch.items():
-            if not isinstance(value, str):
-                batch_original[key] = value
-            elif value.startswith("[") and value.endswith("]"):
-                batch_original[key] = value
-            elif value.startswith("{") and value.endswith("}"):
+            if not self.is_translatable(value):
                 batch_original[key] = value
             else:
+                masked, spans = self.protect(value)
                 batch_input_keys.append(key)
-                batch_input_values.append(self._escape(value))
+                batch_input_values.append(masked)
+                batch_spans.append(spans)
 
         if batch_input_values:
-            batch_output = await self.translator.translate(batch_input_values, dest=MINECRAFT_TO_GOOGLE[target_lang])
-            batch_translated = {key: self._unescape(value.text) for key, value in zip(batch_input_keys, batch_output)}
+            splits = [self.split_text(value) for value in batch_input_values] # strings over MAX_CHARS are sent in pieces
+            try:
+                batch_output = await self.translator.translate([piece for pieces, _ in splits for piece in pieces], dest=MINECRAFT_TO_GOOGLE[target_lang])
+            except Exception as e:
+                match = self.STATUS_PATTERN.match(str(e))
+                if match is None:
+                    raise
+                raise StatusError(int(match.group(1)), str(e)) from e # lets the limiter and retry see 429s and 5xx
+            outputs = iter(batch_output)
+            for key, (pieces, separators), spans in zip(batch_input_keys, splits, batch_spans):
+                texts = [next(outputs).text for _ in pieces]
+                batch_translated[key] = self.restore("".join(text + separator for text, separator in zip(texts, separators + [""])), spans)
         return {**batch_original, **batch_translated}
 
 class DeepLTranslator(Translator):
-    def __init__(self, auth_key: str):
-        self.translator = deepl.DeepLClient(auth_key)
-        super().__init__()
+    BATCH_LIMITS = BatchLimits(items=50, bytes=120 * 1024) # 50 texts and 128 KiB per request, minus the context
+    def __init__(self, auth_key: str, memory: TranslationMemory | None = None):
+        import deepl
+        self.translator = deepl.DeepLClient(auth_key) # keep-alive session, used from worker threads
+        super().__init__(memory)
+
+    def close(self):
+        self.translator.close()
 
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(min=4, max=64), reraise=True)
+    @retry(retry=retry_if_exception(AdaptiveLimiter.is_transient), stop=stop_after_attempt(5), wait=wait_exponential(min=4, max=64), before_sleep=_on_retry, reraise=True)
     async def _translate(self, batch: dict, target_lang: str) -> dict:
         batch_input_keys = []
         batch_input_values = []
         batch_original = {}
         batch_translated = {}
+        batch_spans = []
         
         for key, value in batch.items():
-            if not isinstance(value, str):
-                batch_original[key] = value
-            elif value.startswith("[") and value.endswith("]"):
-                batch_original[key] = value
-            elif value.startswith("{") and value.endswith("}"):
+            if not self.is_translatable(value):
                 batch_original[key] = value
             else:
+                masked, spans = self.protect(value)
                 batch_input_keys.append(key)
-                batch_input_values.append(self._escape(value))
+                batch_input_values.append(masked)
+                batch_spans.append(spans)
 
         if batch_input_values:
             batch_output = await asyncio.to_thread(
                 self.translator.translate_text,
                 text=batch_input_values,
                 target_lang=MINECRAFT_TO_DEEPL[target_lang],
-                context="This is a Minecraft quest text, so please keep the color codes and formatting intact. Example of color codes: <a>, <b>, <1>, <2>, <l>, <r>. Example of formatting: <br>. Example Translation: <a>Hello <br><b>Minecraft! -> <a>안녕하세요 <br><b>마인크래프트!",
+                context="This is a Minecraft quest text, so please keep the numbered tags intact and in place. Example of tags: <0>, <1>, <2>. Example Translation: <0>Hello <1>Minecraft! -> <0>안녕하세요 <1>마인크래프트!",
                 preserve_formatting=True
             )
-            batch_translated = {key: self._unescape(value.text) for key, value in zip(batch_input_keys, batch_output)}
+            batch_translated = {key: self.restore(value.text, spans) for key, value, spans in zip(batch_input_keys, batch_output, batch_spans)}
         return {**batch_original, **batch_translated}
 
 class GeminiTranslator(Translator):
-    def __init__(self, auth_key: str):
+    CONCURRENCY = {"initial": 2, "floor": 1, "ceiling": 8}
+    MAX_FOLLOW_UPS = 2 # requests for keys missing from a response
+
+    def __init__(self, auth_key: str, memory: TranslationMemory | None = None):
+        self.auth_key = auth_key
+        self.chains = weakref.WeakKeyDictionary() # the async client is bound to an event loop
+        self.handler = None
+        super().__init__(memory)
+
+    @property
+    def translator(self):
+        loop = asyncio.get_running_loop()
+        chain = self.chains.get(loop)
+        if chain is None:
+            chain = self.chains[loop] = self._build_chain()
+        return chain
+
+    async def aclose(self):
+        self.chains.pop(asyncio.get_running_loop(), None)
+
+    def close(self):
+        self.chains.clear() # the chain holds no connection of its own to close
+
+    def _build_chain(self):
+        from langchain_core.output_parsers import JsonOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnableLambda
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from src.callbacks import LLMCallbackHandler
+
+        if self.handler is None:
+            self.handler = LLMCallbackHandler(self.__class__.__qualname__)
         llm = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash",
-            google_api_key=auth_key,
+            google_api_key=self.auth_key,
             temperature=0
         )
-        content_extractor = RunnableLambda(lambda msg: getattr(msg, 'content', '') if isinstance(msg, AIMessage) else str(msg)) # extract content
-        json_extractor = RunnableLambda(self.extract_json) # extract json string
-        json_parser = JsonOutputParser() # parse json
+        output_parser = RunnableLambda(self.parse_message) # parse json, repairing only if needed
+        json_parser = JsonOutputParser() # format instructions
         prompt = PromptTemplate(
             template="""You are a Minecraft modpack quest translation assistant.
             Your task is to translate the given JSON-formatted text, while keeping the original JSON structure.
             Be aware that what you are translating is a quest text for Minecraft modpack.
-            The property names in the JSON must remain UNCHANGED and enclosed in DOUBLE QUOTES.
-            You must keep the color codes INTACT. Example of color codes: &a, &b, &1, &2, &l, &r.
-            You must keep the new line symbol (\\n) INTACT.
-            Text enclosed in [] or {{}} must be kept UNCHANGED.
+            The property names in the JSON are short ids. They must remain UNCHANGED and enclosed in DOUBLE QUOTES.
+            Color codes, new lines and formatting are replaced by numbered tags. You must keep the tags INTACT and in place. Example of tags: <0>, <1>, <2>.
             If there are words that are difficult or ambiguous to translate, translate them PHONETICALLY. Also, translate proper nouns PHONETICALLY.
             Translation Examples (en_us -> ko_kr):
-            - &aDiamond Pickaxe&r -> &a다이아몬드 곡괭이&r
-            - {{@pagebreak}} -> {{@pagebreak}}
-            - While the &aUpgrade Template&r is not needed to make the initial tool, it will save you a lot of &6Allthemodium Ingots&r! -> &a업그레이드 템플릿&r은 초기 도구를 만드는 데 필요하지 않지만, &6올더모듐 주괴&r를 많이 절약할 수 있습니다!
+            - <0>Diamond Pickaxe<1> -> <0>다이아몬드 곡괭이<1>
+            - While the <0>Upgrade Template<1> is not needed to make the initial tool, it will save you a lot of <2>Allthemodium Ingots<3>! -> <0>업그레이드 템플릿<1>은 초기 도구를 만드는 데 필요하지 않지만, <2>올더모듐 주괴<3>를 많이 절약할 수 있습니다!
             Your output must follow these format instructions: {format_instructions}
             Translate the following JSON-formatted text to {target_lang}:
             ```json
@@ -205,9 +824,7 @@ class GeminiTranslator(Translator):
             input_variables=["target_lang", "query"],
             partial_variables={"format_instructions": json_parser.get_format_instructions()}
         )
-        self.translator = prompt | llm | content_extractor | json_extractor | json_parser
-        self.handler = LLMCallbackHandler(self.__class__.__qualname__)
-        super().__init__()
+        return prompt | llm | output_parser
     
     @staticmethod
     def extract_json(text: str) -> dict:
@@ -238,30 +855,156 @@ class GeminiTranslator(Translator):
         else:
             raise ValueError("Input must be a string.")
 
+    @classmethod
+    def parse_message(cls, message) -> dict:
+        """Parse an AIMessage, treating output that hit the token limit as truncated."""
+        text = message.content if hasattr(message, "content") else str(message)
+        finish_reason = getattr(message, "response_metadata", {}).get("finish_reason")
+        return cls.parse_json(text, truncated=finish_reason in ("MAX_TOKENS", "length"))
+
+    @classmethod
+    def parse_json(cls, text: str, truncated: bool = False) -> dict:
+        """Parse the model output strictly, repairing malformed output such as a fenced or prose-wrapped object.
+
+        Output is truncated when the model hit its token limit, or when the object or a string in it
+        never closes. Its last value may be cut short, so the last key is dropped and left to a
+        follow-up request. Complete output keeps every key.
+        """
+        body = text.strip()
+        if body.startswith("```"): # strip code fence
+            body = body.partition("\n")[2].rstrip().removesuffix("```")
+        if not truncated:
+            try:
+                return cls._check_dict(json.loads(body))
+            except json.JSONDecodeError:
+                pass
+        start = body.find("{")
+        if start == -1:
+            return cls._check_dict(json.loads(cls.extract_json(text)))
+        end = cls._object_end(body, start)
+        truncated = truncated or end is None
+        data = cls._check_dict(json.loads(repair_json(body[start:end]))) # drops prose after the object
+        if truncated and data:
+            data.popitem()
+        return data
+
+    @staticmethod
+    def _object_end(text: str, start: int) -> int | None:
+        """Index after the brace closing the object at `start`, or None if the object or one of its strings never closes."""
+        depth = 0
+        in_string = False
+        escaped = False
+        for pos in range(start, len(text)):
+            char = text[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if not depth:
+                    return pos + 1
+        return None
+
+    @staticmethod
+    def _check_dict(data) -> dict:
+        if not isinstance(data, dict):
+            raise ValueError("Invalid JSON format.")
+        return data
+
     # Langchain automatically retries failed requests
     async def _translate(self, batch: dict, target_lang: str) -> dict:
-        batch_output = await self.translator.ainvoke(
-            {
-                "target_lang": target_lang,
-                "query": json.dumps(batch, ensure_ascii=False)
-            },
-            config={
-                "callbacks": [self.handler],
-                "verbose": True
+        keys = list(batch) # aliased by their position
+        masked = {}
+        spans = {}
+        for alias, (key, value) in enumerate(batch.items()):
+            if isinstance(value, str):
+                masked[str(alias)], spans[key] = self.protect(value)
+            else:
+                masked[str(alias)] = value
+        result = {}
+        pending = masked
+        for attempt in range(self.MAX_FOLLOW_UPS + 1):
+            if attempt:
+                self.logger.warning("Re-requesting %d of %d keys missing from the response", len(pending), len(batch))
+            batch_output = await self.translator.ainvoke(
+                {
+                    "target_lang": target_lang,
+                    "query": json.dumps(pending, ensure_ascii=False)
+                },
+                config={
+                    "callbacks": [self.handler],
+                    "verbose": True
+                }
+            )
+            answered = { # keep only answers to what was asked
+                alias: value for alias, value in batch_output.items()
+                if alias in pending and (isinstance(value, str) or not isinstance(pending[alias], str))
             }
-        )
-        return batch_output
+            if len(answered) < len(batch_output):
+                self.logger.warning("Dropped %d corrupted or unexpected keys from the response", len(batch_output) - len(answered))
+            result.update(answered)
+            pending = {alias: value for alias, value in pending.items() if alias not in result}
+            if not pending:
+                break
+        return {
+            keys[int(alias)]: self.restore(value, spans[keys[int(alias)]]) if keys[int(alias)] in spans else value
+            for alias, value in result.items()
+        }
+
+class TranslatorFactory:
+    """Translators shared by backend and credential across reruns and sessions.
+
+    Sharing keeps connection pools warm and takes client construction off the interactive path.
+    The least recently used translators beyond MAX_ENTRIES, and released ones, are closed once no
+    translation uses them; all of them are closed at exit.
+    """
+    BACKENDS = {"Google": GoogleTranslator, "DeepL": DeepLTranslator, "Gemini": GeminiTranslator}
+    MAX_ENTRIES = 32
+
+    def __init__(self):
+        self.instances = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(service: str, auth_key: str | None) -> tuple:
+        return service, hashlib.sha256(auth_key.encode()).hexdigest() if auth_key else None
+
+    def get(self, service: str, auth_key: str | None = None, memory: TranslationMemory | None = None) -> Translator:
+        key = self._key(service, auth_key)
+        with self.lock:
+            translator = self.instances.get(key)
+            if translator is None:
+                args = () if auth_key is None else (auth_key,)
+                translator = self.instances[key] = self.BACKENDS[service](*args, memory=memory)
+            self.instances.move_to_end(key)
+            evicted = [self.instances.popitem(last=False)[1] for _ in range(len(self.instances) - self.MAX_ENTRIES)]
+        for old in evicted: # background jobs may still be using them
+            old.retire()
+        return translator
 
-class LLMCallbackHandler(BaseCallbackHandler):
-    def __init__(self, cls_name, *args, **kwargs):
-        self.logger = logging.getLogger(f"{cls_name} ({get_session_id()})")
-        super().__init__(*args, **kwargs)
+    def release(self, service: str, auth_key: str | None = None):
+        with self.lock:
+            translator = self.instances.pop(self._key(service, auth_key), None)
+        if translator is not None:
+            translator.retire()
 
-    def on_llm_start(self, serialized, prompts, **kwargs):
-        self.logger.info("LLM started: %s", serialized)
+    def close_all(self):
+        with self.lock:
+            translators = list(self.instances.values())
+            self.instances.clear()
+        for translator in translators:
+            translator.close()
 
-    def on_llm_error(self, error, **kwargs):
-        self.logger.error("LLM error: %s", error)
+TRANSLATORS = TranslatorFactory()
+atexit.register(TRANSLATORS.close_all)
 
-    def on_retry(self, retry_state, **kwargs):
-        self.logger.warning("LLM retrying: %s", retry_state)
\ No newline at end of file
+def get_translator(service: str, auth_key: str | None = None, memory: TranslationMemory | None = None) -> Translator:
+    return TRANSLATORS.get(service, auth_key, memory)
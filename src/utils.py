@@ -1,30 +1,194 @@
+import sys
+import json
 import hashlib
-import asyncio
-from io import StringIO, BytesIO
+import threading
+from io import BytesIO
+from typing import Any, Awaitable, Callable
+from collections import OrderedDict
+
+import orjson
 
 import streamlit as st
 from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-import deepl
-from langchain_google_genai import ChatGoogleGenerativeAI
-
 from src.constants import MESSAGES
+from src.memory import TranslationMemory
+from src.jobs import Job, JobManager, SESSION_ID
+
+READ_CACHE_MAX_BYTES = 128 * 2 ** 20
+JOB_POLL_INTERVAL = 2 # seconds between progress refreshes of a running job
+
+class _ReadCache:
+    """LRU cache of decoded uploads shared by all sessions, keyed by content digest and bounded by total size."""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, digest: bytes) -> str | None:
+        with self.lock:
+            text = self.entries.get(digest)
+            if text is not None:
+                self.entries.move_to_end(digest)
+            return text
+
+    def put(self, digest: bytes, text: str):
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if digest in self.entries:
+                return
+            self.entries[digest] = text
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+
+_read_cache = _ReadCache(READ_CACHE_MAX_BYTES)
 
-@st.cache_data(ttl=3600)
 def read_file(file: BytesIO) -> str:
-    try:
-        return StringIO(file.getvalue().decode('utf-8')).read()
-    except UnicodeDecodeError:
-        return StringIO(file.getvalue().decode('ISO-8859-1')).read()
+    """Decode an upload as UTF-8, or ISO-8859-1 if it is not valid UTF-8.
+    
+    The text is decoded straight from the upload buffer without copying the bytes first, and
+    identical uploads share one decoded copy through a size-bounded cache.
+    """
+    with file.getbuffer() as buffer:
+        digest = hashlib.blake2b(buffer, digest_size=16).digest()
+        text = _read_cache.get(digest)
+        if text is None:
+            try:
+                text = str(buffer, 'utf-8') # invalid UTF-8 fails at the first bad byte, so this is the only full pass
+            except UnicodeDecodeError:
+                text = str(buffer, 'ISO-8859-1')
+            _read_cache.put(digest, text)
+    return text
 
 def write_file(data: str) -> BytesIO:
     return BytesIO(data.encode('utf-8'))
 
+def dump_json(data: dict | list) -> bytes:
+    """Encode `data` like json.dumps(data, indent=4, ensure_ascii=False), but with orjson.
+    
+    orjson only indents by two spaces, so the indentation is widened afterwards; JSON strings
+    cannot hold raw newlines, so only indentation is touched. Floats in exponent form are
+    written as 1e16 instead of 1e+16. Data orjson refuses (e.g. ints beyond 64 bits)
+    goes through json.
+    """
+    try:
+        output = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except orjson.JSONEncodeError:
+        return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+    
+    # After pass n, lines nested n or more levels deep have 2 extra spaces per finished pass,
+    # so lines at depth d end up with 2 * d + 2 * d = 4 * d spaces. One bytes.replace per level.
+    depth = 1
+    while (indent := b"\n" + b" " * (4 * depth - 2)) in output:
+        output = output.replace(indent, b"\n" + b" " * (4 * depth))
+        depth += 1
+    return output
+
+def cache_output(job_key: str, name: str, encode: Callable[[], bytes | str]) -> bytes | str:
+    """Return the download `name` of job `job_key`, encoding it only the first time.
+    
+    The encoded downloads of the latest job are kept in the session, so reruns that render
+    the download buttons again do not re-serialize the results.
+    """
+    outputs = st.session_state.setdefault("outputs", {})
+    if (job_key, name) not in outputs:
+        for key in [key for key in outputs if key[0] != job_key]: # keep only the latest job per session
+            del outputs[key]
+        outputs[(job_key, name)] = encode()
+    return outputs[(job_key, name)]
+
+@st.cache_resource
+def get_translation_memory() -> TranslationMemory:
+    return TranslationMemory()
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    return JobManager()
+
+def submit_job(name: str, work: Callable[[Job], Awaitable[Any]]) -> Job:
+    """Run `work(job)` in the background and remember the job as `name` in the session."""
+    job = get_job_manager().submit(get_session_id(), work)
+    st.session_state[name] = job.id
+    return job
+
+def get_job(name: str) -> Job | None:
+    """Return the job remembered as `name` in the session, unless it expired."""
+    job_id = st.session_state.get(name)
+    job = get_job_manager().get(job_id) if job_id else None
+    if job is None:
+        st.session_state.pop(name, None)
+    return job
+
+def show_job(job: Job) -> bool:
+    """Draw the status of `job`, and return whether it finished successfully.
+    
+    While the job runs, its status, partial result and a cancel button are refreshed every
+    JOB_POLL_INTERVAL seconds, and the page reruns once the job finishes.
+    """
+    if not job.done():
+        _show_running_job(job)
+        return False
+    
+    status = st.status(
+        label = Message("status_in_progress").text,
+        expanded = True
+    )
+    job.status.draw(status)
+    if job.cancelled():
+        status.update(
+            label = Message("status_cancelled").text,
+            state = "error"
+        )
+        return False
+    if (e := job.exception()) is not None:
+        status.update(
+            label = Message("status_error").text,
+            state = "error"
+        )
+        status.error(f"An error occurred while localizing: {e}")
+        return False
+    status.update(
+        label = Message("status_done").text,
+        state = "complete"
+    )
+    return True
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def _show_running_job(job: Job):
+    if job.done():
+        st.rerun()
+    
+    status = st.status(
+        label = Message("status_in_progress").text,
+        expanded = True
+    )
+    job.status.draw(status)
+    if job.partial is not None:
+        file_name, mime, data = job.partial
+        status.download_button(
+            label = Message("partial_download_label", file_name=file_name).text,
+            data = data,
+            file_name = file_name,
+            on_click = "ignore",
+            mime = mime,
+            key = f"partial-{job.id}-{job.partial_version}"
+        )
+    if st.button(Message("cancel_button_label").text, key=f"cancel-{job.id}"):
+        job.cancel()
+        st.rerun()
+
 def get_session_id() -> str:
-    return get_script_run_ctx().session_id
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else SESSION_ID.get() # no script run context in background jobs or outside `streamlit run`
 
 @st.cache_data(ttl=60)
 def check_deepl_key(auth_key: str) -> bool:
+    import deepl # loaded only when DeepL is selected
     try:
         deepl_client = deepl.DeepLClient(auth_key)
         usage = deepl_client.get_usage()
@@ -34,6 +198,7 @@ def check_deepl_key(auth_key: str) -> bool:
 
 @st.cache_data(ttl=360)
 def check_gemini_key(auth_key: str) -> bool:
+    from langchain_google_genai import ChatGoogleGenerativeAI # loaded only when Gemini is selected
     try:
         llm = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash",
@@ -45,21 +210,6 @@ def check_gemini_key(auth_key: str) -> bool:
     except:
         return False
 
-def schedule_task(key, coro):
-    """Schedules an async task and stores it with a unique key."""
-    if key not in st.session_state.tasks:
-        st.session_state.tasks[key] = st.session_state.loop.create_task(coro)
-
-def process_tasks():
-    """Process pending tasks on the event loop."""
-    pending = [task for task in st.session_state.tasks.values() if not task.done()]
-    if pending:
-        st.session_state.loop.run_until_complete(asyncio.gather(*pending))
-
-def generate_task_key(*args):
-    """Generate a unique hash-based key for a task."""
-    return hashlib.sha256("-".join(map(str, args)).encode()).hexdigest()
-
 class Message:
     message: str
     stop: bool